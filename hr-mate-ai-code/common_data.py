@@ -1,4 +1,11 @@
+import csv
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+import numpy as np
+import orjson
 
 # --- Define Employee Roles with Themes (Templates for Role Name and Theme) ---
 employee_roles = [
@@ -50,54 +57,194 @@ project_summary_templates = [
 
 # Controlled Product Pools per Theme
 product_pools = {
-    "Technical": ["Workflow2000", "Print2.0", "AIScan", "CloudSuite", "IntegrationHub"],
-    "Sales": ["CRM Pro", "Sales Enablement Suite", "Loyalty CRM", "SalesForce Light"],
-    "Marketing": ["Digital Campaign Manager", "SEO Toolkit", "Content CMS", "Social Media Manager"],
-    "HR": ["HRIS Plus", "Onboarding Suite", "Employee Experience Platform"],
-    "Legal": ["Compliance Suite", "Contract Manager Pro", "Regulatory Tracker"],
-    "Consulting": ["ERP Migration Tool", "Business Analysis Framework", "Strategy Kit"]
+    "Technical": ("Workflow2000", "Print2.0", "AIScan", "CloudSuite", "IntegrationHub"),
+    "Sales": ("CRM Pro", "Sales Enablement Suite", "Loyalty CRM", "SalesForce Light"),
+    "Marketing": ("Digital Campaign Manager", "SEO Toolkit", "Content CMS", "Social Media Manager"),
+    "HR": ("HRIS Plus", "Onboarding Suite", "Employee Experience Platform"),
+    "Legal": ("Compliance Suite", "Contract Manager Pro", "Regulatory Tracker"),
+    "Consulting": ("ERP Migration Tool", "Business Analysis Framework", "Strategy Kit")
 }
 
 # Controlled Skill Pools per Theme
 skill_pools = {
-    "Technical": ["Data Analysis", "Workflow Automation", "Cloud Services", "IT Infrastructure", "API Development"],
-    "Sales": ["CRM Integration", "Negotiation", "Client Management", "Customer Relationship Management"],
-    "Marketing": ["SEO Optimization", "Content Strategy", "Campaign Management", "Copywriting", "Branding"],
-    "HR": ["Digital HR", "Organizational Development", "Talent Management", "Communication Skills"],
-    "Legal": ["Contract Management", "Regulatory Knowledge", "Document Review", "Compliance Documentation"],
-    "Consulting": ["Business Analysis", "Strategic Planning", "Workflow Optimization", "Project Management", "Change Management"]
+    "Technical": ("Data Analysis", "Workflow Automation", "Cloud Services", "IT Infrastructure", "API Development"),
+    "Sales": ("CRM Integration", "Negotiation", "Client Management", "Customer Relationship Management"),
+    "Marketing": ("SEO Optimization", "Content Strategy", "Campaign Management", "Copywriting", "Branding"),
+    "HR": ("Digital HR", "Organizational Development", "Talent Management", "Communication Skills"),
+    "Legal": ("Contract Management", "Regulatory Knowledge", "Document Review", "Compliance Documentation"),
+    "Consulting": ("Business Analysis", "Strategic Planning", "Workflow Optimization", "Project Management", "Change Management")
 }
 
+# Integer id per distinct skill across all themes (used for the struct-of-arrays competency export)
+skill_vocab = {skill: skill_id for skill_id, skill in enumerate(sorted({s for pool in skill_pools.values() for s in pool}))}
+
 # Controlled Certifications Pool per Theme
 certification_pools = {
-    "Technical": ["ITIL", "ISO 27001", "Microsoft Azure Certification"],
-    "Sales": ["Certified Sales Professional (CSP)", "CRM Specialist Certification"],
-    "Marketing": ["Digital Marketing Certification", "Google Ads Certification", "HubSpot Marketing Certification"],
-    "HR": ["PMP", "SHRM-CP", "HR Analytics Certification"],
-    "Legal": ["Certified Compliance Officer", "GDPR Certification", "Contract Law Certification"],
-    "Consulting": ["PMP", "Six Sigma", "Agile Practitioner", "Business Analysis Certification"]
+    "Technical": ("ITIL", "ISO 27001", "Microsoft Azure Certification"),
+    "Sales": ("Certified Sales Professional (CSP)", "CRM Specialist Certification"),
+    "Marketing": ("Digital Marketing Certification", "Google Ads Certification", "HubSpot Marketing Certification"),
+    "HR": ("PMP", "SHRM-CP", "HR Analytics Certification"),
+    "Legal": ("Certified Compliance Officer", "GDPR Certification", "Contract Law Certification"),
+    "Consulting": ("PMP", "Six Sigma", "Agile Practitioner", "Business Analysis Certification")
 }
 
 # Controlled Expertise Areas Pool per Theme
 expertise_pools = {
-    "Technical": ["Scripting", "API Integration", "Cloud Infrastructure", "Networking", "Cybersecurity"],
-    "Sales": ["CRM Integration", "Sales Pipeline Automation", "Client Relationship Systems"],
-    "Marketing": ["SEO Optimization", "Content Management Systems", "Social Media Integration"],
-    "HR": ["HRIS Systems", "Employee Experience Platforms", "Organizational Development Systems"],
-    "Legal": ["Document Archiving", "Contract Management Systems", "Regulatory Compliance Tools"],
-    "Consulting": ["Strategic Planning", "Business Workflow Optimization", "ERP Systems Integration"]
+    "Technical": ("Scripting", "API Integration", "Cloud Infrastructure", "Networking", "Cybersecurity"),
+    "Sales": ("CRM Integration", "Sales Pipeline Automation", "Client Relationship Systems"),
+    "Marketing": ("SEO Optimization", "Content Management Systems", "Social Media Integration"),
+    "HR": ("HRIS Systems", "Employee Experience Platforms", "Organizational Development Systems"),
+    "Legal": ("Document Archiving", "Contract Management Systems", "Regulatory Compliance Tools"),
+    "Consulting": ("Strategic Planning", "Business Workflow Optimization", "ERP Systems Integration")
 }
 
-# Predefined vocabularies
-locations_master = ["Berlin", "Vienna", "London"]
-work_flexibility_options = ["onsite", "remote", "hybrid"]
-languages_master = ["English", "French", "German", "Italian"]
-fluency_levels = ["A1", "A2", "B1", "B2", "C1", "C2"]
-industries_master = ["Healthcare", "Education", "Finance", "Manufacturing", "Retail"]
+# Predefined vocabularies (tuples: read-only, shared by both generators)
+locations_master = ("Berlin", "Vienna", "London")
+work_flexibility_options = ("onsite", "remote", "hybrid")
+languages_master = ("English", "French", "German", "Italian")
+fluency_levels = ("A1", "A2", "B1", "B2", "C1", "C2")
+industries_master = ("Healthcare", "Education", "Finance", "Manufacturing", "Retail")
+
+# Precomputed pool sizes, so the generators don't recompute len()/max() per batch
+PRODUCT_POOL_LENS = {theme: len(pool) for theme, pool in product_pools.items()}
+SKILL_POOL_LENS = {theme: len(pool) for theme, pool in skill_pools.items()}
+CERTIFICATION_POOL_LENS = {theme: len(pool) for theme, pool in certification_pools.items()}
+EXPERTISE_POOL_LENS = {theme: len(pool) for theme, pool in expertise_pools.items()}
+MAX_PRODUCT_POOL_LEN = max(PRODUCT_POOL_LENS.values())
+MAX_SKILL_POOL_LEN = max(SKILL_POOL_LENS.values())
+MAX_CERTIFICATION_POOL_LEN = max(CERTIFICATION_POOL_LENS.values())
+MAX_EXPERTISE_POOL_LEN = max(EXPERTISE_POOL_LENS.values())
+LEN_LOCATIONS = len(locations_master)
+LEN_WORK_FLEXIBILITY = len(work_flexibility_options)
+LEN_LANGUAGES = len(languages_master)
+LEN_FLUENCY_LEVELS = len(fluency_levels)
+LEN_INDUSTRIES = len(industries_master)
 
 # --- Typo Function ---
+def _swap_adjacent_chars(text, idx):
+    """Swaps text[idx] and text[idx+1]."""
+    if not text.isascii():
+        # Multi-byte characters: swap code points rather than raw bytes
+        chars = list(text)
+        chars[idx], chars[idx+1] = chars[idx+1], chars[idx]
+        return "".join(chars)
+    # ASCII fast path: one buffer copy and an in-place swap of the two adjacent bytes
+    buf = bytearray(text, 'ascii')
+    buf[idx], buf[idx+1] = buf[idx+1], buf[idx]
+    return buf.decode('ascii')
+
 def introduce_typo(text):
-    if len(text) < 4:
+    text_len = len(text)
+    if text_len < 4:
         return text
-    idx = random.randint(0, len(text) - 2)
-    return text[:idx] + text[idx+1] + text[idx] + text[idx+2:]
+    return _swap_adjacent_chars(text, random.randint(0, text_len - 2))
+
+def introduce_typos_batch(strings, do_typo, positions):
+    """
+    Batch version of introduce_typo driven by pre-drawn randomness (e.g. rows of rng.random() arrays).
+    strings[k] gets a typo if do_typo[k] is truthy; positions[k] in [0, 1) picks which adjacent pair is swapped.
+    Strings shorter than 4 characters are left as is, like introduce_typo.
+    """
+    return [
+        _swap_adjacent_chars(text, int(position * (len(text) - 1))) if flag and len(text) >= 4 else text
+        for text, flag, position in zip(strings, do_typo, positions)
+    ]
+
+# --- Vectorized Sampling Helpers ---
+def draw_permutation_rows(rng, n, max_pool_size):
+    """Draws n independent random permutations of range(max_pool_size) in a single NumPy call (one row per record)."""
+    return np.argsort(rng.random((n, max_pool_size)), axis=1).tolist()
+
+def take_sample(pool, permutation_row, k):
+    """Samples k items from pool without replacement using a row from draw_permutation_rows (k is capped at len(pool))."""
+    pool_len = len(pool)
+    return [pool[j] for j in permutation_row if j < pool_len][:k]
+
+# --- Parallel Record Construction ---
+# Below this many records per worker, process start-up costs more than it saves
+MIN_RECORDS_PER_WORKER = 5000
+
+def build_records_in_chunks(build_chunk, n, num_workers=None):
+    """
+    Builds n records by calling build_chunk(start, end, seed_sequence, today) on contiguous index ranges,
+    in a ProcessPoolExecutor when there is enough work, and concatenates the chunk results in order.
+    build_chunk must be a module-level function returning (records, gemini_requests) and must not call Gemini itself,
+    so API calls stay in the parent process where they are deduplicated and cached.
+    num_workers defaults to os.cpu_count(); each chunk gets an independent child of one SeedSequence.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, n // MIN_RECORDS_PER_WORKER))
+    bounds = np.linspace(0, n, num_workers + 1).astype(int).tolist()
+    starts, ends = bounds[:-1], bounds[1:]
+    seeds = np.random.SeedSequence().spawn(num_workers)
+    today = datetime.now().date() # Resolved once so every chunk agrees on "today"
+
+    if num_workers == 1:
+        chunk_results = [build_chunk(starts[0], ends[0], seeds[0], today)]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            chunk_results = list(executor.map(build_chunk, starts, ends, seeds, [today] * num_workers))
+
+    records, gemini_requests = [], []
+    for chunk_records, chunk_requests in chunk_results:
+        records.extend(chunk_records)
+        gemini_requests.extend(chunk_requests)
+    return records, gemini_requests
+
+# --- Record Writers (stream generated records straight to disk, no DataFrame round-trip) ---
+def _json_default(value):
+    """Serializes dates as epoch milliseconds (UTC), matching the files previously written by pandas' to_json."""
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    if isinstance(value, date):
+        return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp() * 1000)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def write_records_json(records, file_path):
+    """Writes records to a JSON array file with a single orjson call (no DataFrame detour, bytes written directly)."""
+    # OPT_PASSTHROUGH_DATETIME routes dates through _json_default instead of orjson's native ISO format
+    dump_options = orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+    Path(file_path).write_bytes(orjson.dumps(records, default=_json_default, option=dump_options))
+
+def write_records_csv(records, file_path):
+    """Writes records to a CSV file one row at a time. Nested lists/dicts are written as their Python repr."""
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        for record in records:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(record.keys()))
+                writer.writeheader()
+            writer.writerow(record)
+
+def build_competency_arrays(employees):
+    """
+    Flattens every employee's 'Core Competencies' dict into three parallel CSR-style arrays:
+    employee_idx (row in employees), skill_id (see skill_vocab) and level. Skills outside skill_vocab are skipped.
+    """
+    employee_idx, skill_ids, levels = [], [], []
+    for i, employee in enumerate(employees):
+        for skill, level in employee.get("Core Competencies", {}).items():
+            skill_id = skill_vocab.get(skill)
+            if skill_id is not None:
+                employee_idx.append(i)
+                skill_ids.append(skill_id)
+                levels.append(level)
+    return (
+        np.asarray(employee_idx, dtype=np.int32),
+        np.asarray(skill_ids, dtype=np.int16),
+        np.asarray(levels, dtype=np.int8)
+    )
+
+def write_competency_arrays(employees, arrays_path, vocab_path):
+    """Saves the struct-of-arrays competency layout (.npz) and its skill vocabulary sidecar (.json)."""
+    employee_idx, skill_ids, levels = build_competency_arrays(employees)
+    np.savez(
+        arrays_path,
+        employee_ids=np.asarray([employee["EmployeeID"] for employee in employees]),
+        employee_idx=employee_idx,
+        skill_id=skill_ids,
+        level=levels
+    )
+    with open(vocab_path, 'wb') as f:
+        f.write(orjson.dumps(skill_vocab, option=orjson.OPT_INDENT_2))
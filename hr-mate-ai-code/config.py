@@ -1,6 +1,7 @@
 # Configuration file for HR Mate AI
-import json
 import os
+import re
+import orjson
 from datetime import datetime
 
 # Scoring weights for employee-project matching
@@ -54,10 +55,10 @@ def load_data(file_path):
         print(f"Error: Data file not found at {file_path}")
         return None # Or consider returning [] if an empty list is a better default
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         return data
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Could not decode JSON from {file_path}")
         return None # Or consider returning []
     except Exception as e:
@@ -65,48 +66,65 @@ def load_data(file_path):
         return None # Or consider returning []
 
 
+# Date strings already starting with 'YYYY-MM-DD' (optionally followed by a time, 'Z' or fractional part)
+_ISO_DATE_PREFIX_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:[TZ.].*)?$')
+
+def _format_datetime_to_date(dt_obj):
+    return dt_obj.strftime('%Y-%m-%d')
+
+def _format_number_to_date(timestamp_number):
+    """Unix timestamp in seconds or milliseconds."""
+    # Heuristic: if it's a large number (e.g., > 1 Jan 2000 in ms), assume milliseconds
+    if timestamp_number > 946684800000: # Approx 2000-01-01T00:00:00Z in milliseconds
+        timestamp_number /= 1000
+    return datetime.fromtimestamp(float(timestamp_number)).strftime('%Y-%m-%d')
+
+def _format_string_to_date(timestamp_str):
+    """ISO-like date strings. The common 'YYYY-MM-DD...' shape is handled by the precompiled regex without parsing."""
+    cleaned_str = timestamp_str.strip()
+    if not cleaned_str:
+        return "N/A"
+    iso_match = _ISO_DATE_PREFIX_PATTERN.match(cleaned_str)
+    if iso_match:
+        return iso_match.group(1)
+
+    # Clean up common variations like 'Z' for UTC and split off potential microseconds
+    cleaned_str = cleaned_str.replace('Z', '')
+    if '.' in cleaned_str:
+        cleaned_str = cleaned_str.split('.')[0]
+    try:
+        if 'T' in cleaned_str:
+            dt_obj = datetime.fromisoformat(cleaned_str.replace('T', ' '))
+        else: # Assume it's just a date string YYYY-MM-DD
+            dt_obj = datetime.strptime(cleaned_str, '%Y-%m-%d')
+        return dt_obj.strftime('%Y-%m-%d')
+    except ValueError:
+        date_part = timestamp_str.split('T')[0]
+        parts = date_part.split('-')
+        if len(parts) == 3 and all(p.isdigit() for p in parts):
+            if len(parts[0]) == 4 and len(parts[1]) <= 2 and len(parts[2]) <= 2:
+                return date_part
+        return timestamp_str # Unparseable format, return as is
+
+# Formatter per input type; subclasses (e.g. pandas.Timestamp, bool) are resolved via isinstance in format_timestamp_to_date
+_DATE_FORMATTERS_BY_TYPE = {
+    datetime: _format_datetime_to_date,
+    int: _format_number_to_date,
+    float: _format_number_to_date,
+    str: _format_string_to_date,
+}
+
 def format_timestamp_to_date(timestamp_input):
     """Formats various timestamp inputs to 'YYYY-MM-DD' string. Handles integers, floats, and ISO-like date strings."""
-    if timestamp_input is None or str(timestamp_input).strip() == '':
+    if timestamp_input is None:
         return "N/A"
+    formatter = _DATE_FORMATTERS_BY_TYPE.get(type(timestamp_input))
+    if formatter is None:
+        formatter = next((f for input_type, f in _DATE_FORMATTERS_BY_TYPE.items() if isinstance(timestamp_input, input_type)), None)
+        if formatter is None:
+            return str(timestamp_input) # e.g. datetime.date objects, which already print as YYYY-MM-DD
     try:
-        # If it's already a datetime object
-        if isinstance(timestamp_input, datetime):
-            return timestamp_input.strftime('%Y-%m-%d')
-        
-        # Try to parse as a number (Unix timestamp in seconds or milliseconds)
-        if isinstance(timestamp_input, (int, float)):
-            # Heuristic: if it's a large number (e.g., > 1 Jan 2000 in ms), assume milliseconds
-            if timestamp_input > 946684800000: # Approx 2000-01-01T00:00:00Z in milliseconds
-                 timestamp_input /= 1000
-            return datetime.fromtimestamp(float(timestamp_input)).strftime('%Y-%m-%d')
-        
-        # Try to parse as an ISO-like date string
-        if isinstance(timestamp_input, str):
-            # Clean up common variations like 'Z' for UTC or extra spaces
-            timestamp_str = timestamp_input.strip().replace('Z', '')
-            # Handle potential microseconds by splitting them off
-            if '.' in timestamp_str:
-                timestamp_str = timestamp_str.split('.')[0]
-            
-            # Attempt to parse common ISO-like formats
-            if 'T' in timestamp_str:
-                 dt_obj = datetime.fromisoformat(timestamp_str.replace('T', ' '))
-            else: # Assume it's just a date string YYYY-MM-DD
-                 dt_obj = datetime.strptime(timestamp_str, '%Y-%m-%d')
-            return dt_obj.strftime('%Y-%m-%d')
-            
-    except (ValueError, TypeError) as e:
-        # print(f"Warning: Could not parse date: {timestamp_input} due to {e}. Returning as is.")
-        if isinstance(timestamp_input, str) and '-' in timestamp_input:
-            parts = timestamp_input.split('T')[0].split('-')
-            if len(parts) == 3 and all(p.isdigit() for p in parts):
-                 if len(parts[0]) == 4 and len(parts[1]) <= 2 and len(parts[2]) <= 2:
-                    return timestamp_input.split('T')[0]
-        return str(timestamp_input) # Fallback for other errors or unparseable formats
-    except Exception as e:
-        # print(f"Unexpected error formatting date {timestamp_input}: {e}")
-        return str(timestamp_input) # Fallback for other errors
-
-    # Default fallback if no case matched or if input was problematic from the start
-    return str(timestamp_input) if timestamp_input is not None else "N/A"
+        return formatter(timestamp_input)
+    except Exception:
+        # print(f"Warning: Could not parse date: {timestamp_input}. Returning as is.")
+        return str(timestamp_input) # Fallback for out-of-range timestamps or other errors
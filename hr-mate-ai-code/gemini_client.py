@@ -0,0 +1,130 @@
+# Shared Gemini helpers for the synthetic data generators (generate_employees.py / generate_projects.py)
+import functools
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from cachetools import LRUCache
+import diskcache
+from google.api_core import exceptions as google_exceptions
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+# Number of Gemini requests kept in flight at once. Calls are network-bound, so threads are enough.
+GEMINI_MAX_WORKERS = 32
+
+# Max number of distinct generation inputs remembered in memory per generator function
+GEMINI_MEMO_MAXSIZE = 4096
+
+# On-disk cache of Gemini responses keyed on the prompt, so re-running a generator doesn't re-pay for unchanged prompts
+GEMINI_CACHE_DIR = "./.gemini_cache"
+
+# Gemini model used by both generators
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'
+
+@functools.lru_cache(maxsize=None)
+def get_model(api_key, model_name=GEMINI_MODEL_NAME):
+    """
+    Configures the Gemini API and returns the model on first use (None if no API key is set).
+    google.generativeai (protobuf/grpc) is only imported here, so importing the generators for their helpers stays cheap.
+    """
+    if not api_key:
+        print("GEMINI_API_KEY not found in .env file. Please set it up.")
+        return None # Or handle this case as an error
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+# Transient errors worth retrying (rate limiting / temporary unavailability)
+_RETRYABLE_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,   # 429
+    google_exceptions.ServiceUnavailable,  # 503
+    google_exceptions.DeadlineExceeded,
+)
+
+@retry(
+    retry=retry_if_exception_type(_RETRYABLE_GEMINI_ERRORS),
+    wait=wait_exponential(multiplier=1, min=1, max=30),
+    stop=stop_after_attempt(5),
+    reraise=True
+)
+def generate_content_with_retry(model, prompt):
+    """Calls model.generate_content, retrying transient (e.g. 429) errors with exponential backoff."""
+    return model.generate_content(prompt)
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def _get_response_cache():
+    """Opens the on-disk response cache on first use."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = diskcache.Cache(GEMINI_CACHE_DIR)
+    return _response_cache
+
+def _prompt_cache_key(prompt):
+    return hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+
+def get_cached_response_text(prompt):
+    """Returns the previously stored response text for this exact prompt, or None."""
+    return _get_response_cache().get(_prompt_cache_key(prompt))
+
+def store_response_text(prompt, response_text):
+    """Persists a successful response text for this prompt (diskcache is thread- and process-safe)."""
+    _get_response_cache().set(_prompt_cache_key(prompt), response_text)
+
+def run_concurrently(func, kwargs_list, max_workers=GEMINI_MAX_WORKERS):
+    """Runs func(**kwargs) for every kwargs dict in a thread pool. Results are returned in input order."""
+    if not kwargs_list:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(kwargs_list))) as executor:
+        return list(executor.map(lambda kwargs: func(**kwargs), kwargs_list))
+
+def run_deduplicated(func, kwargs_list, key_func, max_workers=GEMINI_MAX_WORKERS):
+    """
+    Like run_concurrently, but func is only dispatched once per distinct key_func(**kwargs) (e.g. the prompt string);
+    the result is then fanned out to every request sharing that key. Results are returned in input order.
+    """
+    request_keys = [key_func(**kwargs) for kwargs in kwargs_list]
+    unique_requests = {}
+    for key, kwargs in zip(request_keys, kwargs_list):
+        unique_requests.setdefault(key, kwargs)
+    unique_results = dict(zip(unique_requests, run_concurrently(func, list(unique_requests.values()), max_workers)))
+    return [unique_results[key] for key in request_keys]
+
+def memoize_generation(key_func, maxsize=GEMINI_MEMO_MAXSIZE):
+    """
+    Decorator memoizing a Gemini-backed generator function on key_func(*args, **kwargs).
+    key_func must return a hashable, canonical key (e.g. sorted tuples instead of lists/dicts).
+    Safe to use from run_concurrently: concurrent callers with the same key share a single in-flight call.
+    Only returned values are memoized: the wrapped function must raise on API failures (and the caller apply any
+    fallback outside the memo), otherwise a transient failure's fallback would be cached for the rest of the run.
+    """
+    def decorator(func):
+        cache = LRUCache(maxsize=maxsize)
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = key_func(*args, **kwargs)
+            with lock:
+                future = cache.get(key)
+                is_owner = future is None
+                if is_owner:
+                    future = Future()
+                    cache[key] = future
+            if is_owner:
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    with lock:
+                        cache.pop(key, None) # Don't remember failures
+                    future.set_exception(e)
+            return future.result()
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
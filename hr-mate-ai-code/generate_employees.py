@@ -1,37 +1,29 @@
-import pandas as pd
-from datetime import datetime, timedelta
-import random
+import numpy as np
+from datetime import timedelta
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
+from gemini_client import (
+    generate_content_with_retry, get_cached_response_text, get_model, memoize_generation, run_deduplicated,
+    store_response_text
+)
 
 # Import data from common_data.py
 from common_data import (
     employee_roles, product_pools, skill_pools, certification_pools, 
     expertise_pools, industries_master, locations_master, 
-    work_flexibility_options, languages_master, fluency_levels, introduce_typo
+    work_flexibility_options, languages_master, fluency_levels, introduce_typo,
+    LEN_FLUENCY_LEVELS, LEN_INDUSTRIES, LEN_LANGUAGES, LEN_LOCATIONS, LEN_WORK_FLEXIBILITY,
+    MAX_CERTIFICATION_POOL_LEN, MAX_EXPERTISE_POOL_LEN, MAX_PRODUCT_POOL_LEN, MAX_SKILL_POOL_LEN,
+    build_records_in_chunks, draw_permutation_rows, take_sample, write_competency_arrays, write_records_csv, write_records_json
 )
 
 # Load environment variables from .env file
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Configure the Gemini API
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-1.5-flash') # Or your preferred model
-else:
-    print("GEMINI_API_KEY not found in .env file. Please set it up.")
-    model = None # Or handle this case as an error
-
-def generate_employee_role_description_with_gemini(theme, products_experience, core_competencies, industry_experience, original_description):
-    """Generates an employee role description using the Gemini API."""
-    if not model:
-        print("Gemini model not initialized. Returning original description.")
-        return original_description # Fallback if API key is missing
-
-    # Construct a detailed prompt for Gemini
-    prompt = (
+def build_employee_role_prompt(theme, products_experience, core_competencies, industry_experience, original_description):
+    """Builds the Gemini prompt for an employee role description."""
+    return (
         f"Write a 3-4 sentence role description for an employee profile, written in the first person (e.g., 'I am a...'). "
         f"I fit the theme: '{theme}'.\n"
         f"My key product experience includes: {', '.join(products_experience)}.\n"
@@ -42,82 +34,164 @@ def generate_employee_role_description_with_gemini(theme, products_experience, c
         f"The tone should be professional yet approachable, suitable for an internal HR matching system where I'm presenting myself."
     )
 
+def _role_description_cache_key(theme, products_experience, core_competencies, industry_experience, original_description):
+    """Canonical, hashable key for the role description inputs (order of products/skills/industries doesn't matter)."""
+    return (
+        theme,
+        tuple(sorted(products_experience)),
+        tuple(sorted(core_competencies.items())),
+        tuple(sorted(industry_experience)),
+        original_description
+    )
+
+@memoize_generation(_role_description_cache_key)
+def _generate_role_description_text(theme, products_experience, core_competencies, industry_experience, original_description):
+    """
+    Generated role description text. Raises on API errors and unusable responses, so a failure is never memoized
+    (the fallback is applied by generate_employee_role_description_with_gemini).
+    """
+    prompt = build_employee_role_prompt(theme, products_experience, core_competencies, industry_experience, original_description)
+
+    cached_text = get_cached_response_text(prompt)
+    if cached_text is not None:
+        return cached_text
+
+    response = generate_content_with_retry(get_model(GEMINI_API_KEY), prompt)
+    # Simple error check for response structure
+    if not response.parts:
+        raise ValueError(f"Gemini API response for role description did not contain expected parts. Response: {response}")
+    generated_text = response.text.strip()
+    # Further clean-up if necessary (e.g., removing markdown)
+    store_response_text(prompt, generated_text)
+    return generated_text
+
+def generate_employee_role_description_with_gemini(theme, products_experience, core_competencies, industry_experience, original_description):
+    """Generates an employee role description using the Gemini API."""
+    if not get_model(GEMINI_API_KEY):
+        print("Gemini model not initialized. Returning original description.")
+        return original_description # Fallback if API key is missing
+
     try:
-        response = model.generate_content(prompt)
-        # Simple error check for response structure
-        if response.parts:
-            generated_text = response.text.strip()
-            # Further clean-up if necessary (e.g., removing markdown)
-            return generated_text
-        else:
-            print(f"Gemini API response for role description did not contain expected parts. Response: {response}")
-            return original_description # Fallback
+        return _generate_role_description_text(theme, products_experience, core_competencies, industry_experience, original_description)
     except Exception as e:
         print(f"Error calling Gemini API for role description: {e}")
-        return original_description # Fallback in case of API error
+        return original_description # Fallback in case of API error (not memoized: a later request retries)
+
+def _build_employee_chunk(start, end, seed, today):
+    """
+    Builds the employee records with indices [start, end) and their role description requests (no Gemini calls).
+    Module-level and driven by an explicit seed so it can run in a worker process.
+    """
+    n = end - start
+    # Draw all random numbers for all employees of the chunk up front (one NumPy call per attribute instead of per employee)
+    rng = np.random.Generator(np.random.SFC64(seed)) # SFC64: faster bit generation than the default PCG64
+    template_idx = rng.integers(0, len(employee_roles), size=n).tolist()
+    n_products = rng.integers(1, 4, size=n).tolist()
+    n_skills = rng.integers(2, 6, size=n).tolist()
+    skill_levels = rng.integers(4, 11, size=(n, MAX_SKILL_POOL_LEN)).tolist()
+    n_certifications = rng.integers(1, 3, size=n).tolist()
+    n_expertise = rng.integers(1, 3, size=n).tolist()
+    n_industries = rng.integers(1, 4, size=n).tolist()
+    location_idx = rng.integers(0, LEN_LOCATIONS, size=n).tolist()
+    flexibility_idx = rng.integers(0, LEN_WORK_FLEXIBILITY, size=n).tolist()
+    n_languages = rng.integers(1, 4, size=n).tolist()
+    fluency_idx = rng.integers(0, LEN_FLUENCY_LEVELS, size=(n, LEN_LANGUAGES)).tolist()
+    available_in_days = rng.integers(0, 31, size=n).tolist()
+    weekly_hours = rng.choice([10, 20, 30, 40], size=n).tolist()
+    cultural_awareness, problem_solving, leadership = rng.integers(1, 11, size=(3, n)).tolist()
+    # Random permutations used for sampling without replacement from the pools
+    product_perms = draw_permutation_rows(rng, n, MAX_PRODUCT_POOL_LEN)
+    skill_perms = draw_permutation_rows(rng, n, MAX_SKILL_POOL_LEN)
+    certification_perms = draw_permutation_rows(rng, n, MAX_CERTIFICATION_POOL_LEN)
+    expertise_perms = draw_permutation_rows(rng, n, MAX_EXPERTISE_POOL_LEN)
+    industry_perms = draw_permutation_rows(rng, n, LEN_INDUSTRIES)
+    language_perms = draw_permutation_rows(rng, n, LEN_LANGUAGES)
 
-def generate_smart_employees_full(n):
+    # Resolve the theme pools once per theme instead of re-hashing four dicts for every record
+    pools_by_theme = {
+        theme: (product_pools[theme], skill_pools[theme], certification_pools[theme], expertise_pools[theme])
+        for theme in {template["Theme"] for template in employee_roles}
+    }
+
+    record_ids = tuple(f"E{i:03d}" for i in range(start + 1, end + 1)) # Padded IDs
     employees = []
+    gemini_requests = [] # Role description inputs, one per employee (same order as employees)
     for i in range(n):
-        emp_template = random.choice(employee_roles)
+        emp_template = employee_roles[template_idx[i]]
         theme = emp_template["Theme"]
+        theme_products, theme_skills, theme_certifications, theme_expertise = pools_by_theme[theme]
+
+        product_experience = take_sample(theme_products, product_perms[i], n_products[i])
+        core_competencies = {skill: level for skill, level in zip(take_sample(theme_skills, skill_perms[i], n_skills[i]), skill_levels[i])}
+        certifications = take_sample(theme_certifications, certification_perms[i], n_certifications[i])
+        expertise = take_sample(theme_expertise, expertise_perms[i], n_expertise[i])
+        industry_experience = take_sample(industries_master, industry_perms[i], n_industries[i])
+        languages = take_sample(languages_master, language_perms[i], n_languages[i])
 
-        product_experience = random.sample(product_pools[theme], k=min(len(product_pools[theme]), random.randint(1, 3)))
-        core_competencies = {skill: random.randint(4, 10) for skill in random.sample(skill_pools[theme], k=min(len(skill_pools[theme]), random.randint(2, 5)))}
-        certifications = random.sample(certification_pools[theme], k=min(len(certification_pools[theme]), random.randint(1, 2)))
-        expertise = random.sample(expertise_pools[theme], k=min(len(expertise_pools[theme]), random.randint(1, 2)))
-        industry_experience = random.sample(industries_master, k=random.randint(1, 3))
-
-        # Generate Role Description using Gemini
-        generated_role_description = generate_employee_role_description_with_gemini(
-            theme=theme,
-            products_experience=product_experience,
-            core_competencies=core_competencies,
-            industry_experience=industry_experience,
-            original_description=emp_template["Role Description"] # Pass original for context
-        )
+        gemini_requests.append({
+            "theme": theme,
+            "products_experience": product_experience,
+            "core_competencies": core_competencies,
+            "industry_experience": industry_experience,
+            "original_description": emp_template["Role Description"] # Pass original for context
+        })
 
         employee = {
-            "EmployeeID": f"E{i+1:03d}", # Padded ID
+            "EmployeeID": record_ids[i],
             "Role Name": emp_template["Role Name"],
-            "Role Description": generated_role_description, # Use Gemini's output
+            "Role Description": None, # Filled in below from Gemini's output
             "Theme": theme,
             "Products Experience": product_experience,
             "Core Competencies": core_competencies,
             "External/Internal Certifications": certifications,
             "Expertise Areas": expertise,
             "Industry Experience": industry_experience,
-            "Work Location": random.choice(locations_master),
-            "Work Flexibility": random.choice(work_flexibility_options),
-            "Languages Known": {lang: random.choice(fluency_levels)
-                                for lang in random.sample(languages_master, k=random.randint(1, 3))},
-            "Available From": datetime.now().date() + timedelta(days=random.randint(0, 30)),
-            "Weekly Availability in Hours": random.choice([10, 20, 30, 40]),
-            "Cultural Awareness": random.randint(1, 10),
-            "Problem Solving": random.randint(1, 10),
-            "Leadership": random.randint(1, 10)
+            "Work Location": locations_master[location_idx[i]],
+            "Work Flexibility": work_flexibility_options[flexibility_idx[i]],
+            "Languages Known": {lang: fluency_levels[fluency_idx[i][j]] for j, lang in enumerate(languages)},
+            "Available From": today + timedelta(days=available_in_days[i]),
+            "Weekly Availability in Hours": weekly_hours[i],
+            "Cultural Awareness": cultural_awareness[i],
+            "Problem Solving": problem_solving[i],
+            "Leadership": leadership[i]
         }
         employees.append(employee)
-    return pd.DataFrame(employees)
+    return employees, gemini_requests
+
+def generate_smart_employees_full(n, num_workers=None):
+    # Build the records in parallel chunks (pure Python/NumPy work), then make the Gemini calls from this process only
+    employees, gemini_requests = build_records_in_chunks(_build_employee_chunk, n, num_workers)
+
+    # Generate Role Descriptions using Gemini, with many requests in flight and one call per distinct prompt instead of one serial call per employee
+    generated_role_descriptions = run_deduplicated(generate_employee_role_description_with_gemini, gemini_requests, key_func=build_employee_role_prompt)
+    for employee, generated_role_description in zip(employees, generated_role_descriptions):
+        employee["Role Description"] = generated_role_description # Use Gemini's output
+    return employees
 
 if __name__ == "__main__":
     num_employees_to_generate = 1000
     print(f"Generating {num_employees_to_generate} employee records...")
     
     # Ensure API key is loaded before generating
-    if not GEMINI_API_KEY or not model:
+    if not get_model(GEMINI_API_KEY):
         print("Exiting: Gemini API key not configured. Please check your .env file.")
     else:
-        employees_df = generate_smart_employees_full(num_employees_to_generate)
-        print("\nGenerated Employee Data:")
-        print(employees_df)
+        employees = generate_smart_employees_full(num_employees_to_generate)
+        print(f"\nGenerated {len(employees)} employee records. First record:")
+        print(employees[0] if employees else "N/A")
         
         # Save to CSV
         csv_output_path = "generated_employees.csv"
-        employees_df.to_csv(csv_output_path, index=False)
+        write_records_csv(employees, csv_output_path)
         print(f"\nEmployee data saved to {csv_output_path}")
 
         # Save to JSON
         json_output_path = "generated_employees.json"
-        employees_df.to_json(json_output_path, orient="records", indent=4)
+        write_records_json(employees, json_output_path)
         print(f"Employee data saved to {json_output_path}")
+
+        # Save Core Competencies as parallel arrays (employee_idx, skill_id, level) for vectorized skill scoring
+        competencies_output_path = "employee_competencies.npz"
+        skill_vocab_output_path = "skill_vocab.json"
+        write_competency_arrays(employees, competencies_output_path, skill_vocab_output_path)
+        print(f"Core competency arrays saved to {competencies_output_path} (vocabulary: {skill_vocab_output_path})")
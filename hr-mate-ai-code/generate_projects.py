@@ -1,38 +1,36 @@
-import pandas as pd
-from datetime import datetime, timedelta
-import random
+import numpy as np
+from datetime import timedelta
 import os
+import re
 from dotenv import load_dotenv
-import google.generativeai as genai
-import json
+import orjson
+from gemini_client import (
+    generate_content_with_retry, get_cached_response_text, get_model, memoize_generation, run_deduplicated,
+    store_response_text
+)
 
 # Import data from common_data.py
 from common_data import (
     project_summary_templates, product_pools, skill_pools, certification_pools, 
     expertise_pools, industries_master, locations_master, work_flexibility_options, 
-    languages_master, fluency_levels, introduce_typo
+    languages_master, fluency_levels, introduce_typos_batch,
+    LEN_FLUENCY_LEVELS, LEN_INDUSTRIES, LEN_LANGUAGES, LEN_LOCATIONS, LEN_WORK_FLEXIBILITY,
+    MAX_CERTIFICATION_POOL_LEN, MAX_EXPERTISE_POOL_LEN, MAX_PRODUCT_POOL_LEN, MAX_SKILL_POOL_LEN,
+    build_records_in_chunks, draw_permutation_rows, take_sample, write_records_csv, write_records_json
 )
 
 # Load environment variables from .env file
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Configure the Gemini API
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-1.5-flash') # Or your preferred model
-else:
-    print("GEMINI_API_KEY not found in .env file. Please set it up.")
-    model = None # Or handle this case as an error
+# Markdown code fence Gemini sometimes wraps its JSON answer in (```json ... ``` or ``` ... ```)
+_CODE_FENCE_PATTERN = re.compile(r'^```(?:json)?\s*|\s*```$')
+# Trailing comma before a closing brace/bracket, the most common way Gemini's JSON is malformed
+_TRAILING_COMMA_PATTERN = re.compile(r',\s*([}\]])')
 
-def generate_project_details_with_gemini(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope):
-    """Generates project summary and scope/deliverables using the Gemini API."""
-    if not model:
-        print("Gemini model not initialized. Returning original details.")
-        return {"Project Summary": original_summary, "Scope and Deliverables": original_scope}
-
-    # Construct a detailed prompt for Gemini
-    prompt = (
+def build_project_details_prompt(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope):
+    """Builds the Gemini prompt for a project summary and scope/deliverables."""
+    return (
         f"Generate a concise project summary (2-3 sentences) and a bulleted list of scope/deliverables for a new project. "
         f"The project's theme is: '{theme}'.\n"
         f"Products involved: {', '.join(products_involved)}.\n"
@@ -46,103 +44,201 @@ def generate_project_details_with_gemini(theme, products_involved, required_skil
         f"{{\"Project Summary\": \"Your generated summary here.\", \"Scope and Deliverables\": \"- Item 1\n- Item 2\"}}"
     )
 
+def _project_details_cache_key(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope):
+    """Canonical, hashable key for the project details inputs (order of products/skills doesn't matter)."""
+    return (
+        theme,
+        tuple(sorted(products_involved)),
+        tuple(sorted(required_skills.items())),
+        customer_industry,
+        complexity,
+        original_summary,
+        original_scope
+    )
+
+def _parse_project_details_json(generated_text):
+    """
+    Parses Gemini's answer into a dict, or returns None if it isn't a JSON object.
+    Obviously non-JSON answers are rejected with a cheap prefix check instead of raising/catching a decode error.
+    """
+    # Clean the text if it's wrapped in markdown for JSON
+    generated_text = _CODE_FENCE_PATTERN.sub('', generated_text).strip()
+    if not generated_text.startswith('{'):
+        return None
     try:
-        response = model.generate_content(prompt)
-        generated_text = response.text.strip()
-        
-        # Attempt to parse the JSON-like string from Gemini
-        # This is a simplified parser; a more robust one might be needed for complex cases
+        data = orjson.loads(generated_text)
+    except orjson.JSONDecodeError:
+        # Retry once with trailing commas removed
         try:
-            # Clean the text if it's wrapped in markdown for JSON
-            if generated_text.startswith("```json"):
-                generated_text = generated_text[7:-3].strip()
-            elif generated_text.startswith("```") and generated_text.endswith("```"):
-                generated_text = generated_text[3:-3].strip()
-
-            # Attempt to parse the string as JSON
-            data = json.loads(generated_text)
-            parsed_summary = data.get("Project Summary", original_summary)
-            parsed_scope = data.get("Scope and Deliverables", original_scope)
-            return {"Project Summary": parsed_summary, "Scope and Deliverables": parsed_scope}
-        
-        except json.JSONDecodeError as json_err:
-            print(f"JSONDecodeError parsing Gemini response: {json_err}. Raw response: {generated_text}")
-            # Fallback if JSON parsing fails
-            return {"Project Summary": original_summary, "Scope and Deliverables": original_scope}
-        except Exception as e:
-            print(f"Unexpected error parsing Gemini response: {e}. Raw response: {generated_text}")
-            return {"Project Summary": original_summary, "Scope and Deliverables": original_scope}
-            
+            data = orjson.loads(_TRAILING_COMMA_PATTERN.sub(r'\1', generated_text))
+        except orjson.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
+
+@memoize_generation(_project_details_cache_key)
+def _generate_project_details(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope):
+    """
+    Generated summary/scope dict. Raises on API errors and unparseable responses, so a failure is never memoized
+    (the fallback is applied by generate_project_details_with_gemini).
+    """
+    prompt = build_project_details_prompt(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope)
+
+    generated_text = get_cached_response_text(prompt)
+    is_cached_response = generated_text is not None
+    if not is_cached_response:
+        response = generate_content_with_retry(get_model(GEMINI_API_KEY), prompt)
+        generated_text = response.text.strip()
+
+    data = _parse_project_details_json(generated_text)
+    if data is None:
+        raise ValueError(f"Could not parse Gemini response as a JSON object. Raw response: {generated_text}")
+    if not is_cached_response:
+        store_response_text(prompt, generated_text) # Only remember responses that parsed
+    return {
+        "Project Summary": data.get("Project Summary", original_summary),
+        "Scope and Deliverables": data.get("Scope and Deliverables", original_scope)
+    }
+
+def generate_project_details_with_gemini(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope):
+    """Generates project summary and scope/deliverables using the Gemini API."""
+    fallback = {"Project Summary": original_summary, "Scope and Deliverables": original_scope}
+    if not get_model(GEMINI_API_KEY):
+        print("Gemini model not initialized. Returning original details.")
+        return fallback
+
+    try:
+        return _generate_project_details(theme, products_involved, required_skills, customer_industry, complexity, original_summary, original_scope)
     except Exception as e:
-        print(f"Error calling Gemini API for project details: {e}")
-        return {"Project Summary": original_summary, "Scope and Deliverables": original_scope} # Fallback
+        print(f"Error generating project details with the Gemini API: {e}")
+        return fallback # Not memoized: a later request retries
+
+def _build_project_chunk(start, end, seed, today):
+    """
+    Builds the project records with indices [start, end) and their summary/scope requests (no Gemini calls).
+    Module-level and driven by an explicit seed so it can run in a worker process.
+    """
+    n = end - start
+    # Draw all random numbers for all projects of the chunk up front (one NumPy call per attribute instead of per project)
+    rng = np.random.Generator(np.random.SFC64(seed)) # SFC64: faster bit generation than the default PCG64
+    template_idx = rng.integers(0, len(project_summary_templates), size=n).tolist()
+    n_products = rng.integers(1, 4, size=n).tolist()
+    n_skills = rng.integers(2, 6, size=n).tolist()
+    skill_levels = rng.integers(5, 11, size=(n, MAX_SKILL_POOL_LEN)).tolist()
+    n_certifications = rng.integers(1, 3, size=n).tolist()
+    n_expertise = rng.integers(1, 3, size=n).tolist()
+    industry_idx = rng.integers(0, LEN_INDUSTRIES, size=n).tolist()
+    complexity = rng.integers(1, 11, size=n).tolist()
+    location_idx = rng.integers(0, LEN_LOCATIONS, size=n).tolist()
+    flexibility_idx = rng.integers(0, LEN_WORK_FLEXIBILITY, size=n).tolist()
+    n_languages = rng.integers(1, 4, size=n).tolist()
+    fluency_idx = rng.integers(0, LEN_FLUENCY_LEVELS, size=(n, LEN_LANGUAGES)).tolist()
+    effort_hours = (rng.integers(2, 25, size=n) * 10).tolist() # 20 to 240 hours in steps of 10
+    end_in_days = rng.integers(30, 151, size=n).tolist()
+    # Typo decisions for every (typo-able) field of every project, drawn as boolean masks in one go
+    product_typos = (rng.random((n, 3)) < 0.4).tolist() # Up to 3 products per project
+    skill_typos = (rng.random((n, MAX_SKILL_POOL_LEN)) < 0.4).tolist()
+    industry_typos = (rng.random(n) < 0.4).tolist()
+    location_typos = (rng.random(n) < 0.3).tolist()
+    language_typos = (rng.random((n, LEN_LANGUAGES)) < 0.3).tolist()
+    # Where each typo lands: a fraction of the string length, mapped to a character index by introduce_typos_batch
+    product_typo_pos = rng.random((n, 3)).tolist()
+    skill_typo_pos = rng.random((n, MAX_SKILL_POOL_LEN)).tolist()
+    industry_typo_pos = rng.random(n).tolist()
+    location_typo_pos = rng.random(n).tolist()
+    language_typo_pos = rng.random((n, LEN_LANGUAGES)).tolist()
+    # Random permutations used for sampling without replacement from the pools
+    product_perms = draw_permutation_rows(rng, n, MAX_PRODUCT_POOL_LEN)
+    skill_perms = draw_permutation_rows(rng, n, MAX_SKILL_POOL_LEN)
+    certification_perms = draw_permutation_rows(rng, n, MAX_CERTIFICATION_POOL_LEN)
+    expertise_perms = draw_permutation_rows(rng, n, MAX_EXPERTISE_POOL_LEN)
+    language_perms = draw_permutation_rows(rng, n, LEN_LANGUAGES)
 
-def generate_smart_projects_full(n):
+    # Resolve the theme pools once per theme instead of re-hashing four dicts for every record
+    pools_by_theme = {
+        theme: (product_pools[theme], skill_pools[theme], certification_pools[theme], expertise_pools[theme])
+        for theme in {template["Theme"] for template in project_summary_templates}
+    }
+
+    # Single-valued fields get their typos for the whole chunk in one batch
+    project_industries = introduce_typos_batch([industries_master[j] for j in industry_idx], industry_typos, industry_typo_pos)
+    work_locations = introduce_typos_batch([locations_master[j] for j in location_idx], location_typos, location_typo_pos)
+
+    record_ids = tuple(f"P{i:03d}" for i in range(start + 1, end + 1)) # Padded IDs
     projects = []
+    gemini_requests = [] # Summary/scope inputs, one per project (same order as projects)
     for i in range(n):
-        proj_template = random.choice(project_summary_templates)
+        proj_template = project_summary_templates[template_idx[i]]
         theme = proj_template["Theme"]
+        theme_products, theme_skills, theme_certifications, theme_expertise = pools_by_theme[theme]
 
-        products = [introduce_typo(p) if random.random() < 0.4 else p
-                    for p in random.sample(product_pools[theme], k=min(len(product_pools[theme]), random.randint(1, 3)))]
-        required_skills = {
-            (introduce_typo(skill) if random.random() < 0.4 else skill): random.randint(5, 10)
-            for skill in random.sample(skill_pools[theme], k=min(len(skill_pools[theme]), random.randint(2, 5)))
-        }
-        certifications = random.sample(certification_pools[theme], k=min(len(certification_pools[theme]), random.randint(1, 2)))
-        expertise = random.sample(expertise_pools[theme], k=min(len(expertise_pools[theme]), random.randint(1, 2)))
-        project_industry = introduce_typo(random.choice(industries_master)) if random.random() < 0.4 else random.choice(industries_master)
-        project_complexity = random.randint(1, 10)
-
-        # Generate Project Summary and Scope using Gemini
-        gemini_details = generate_project_details_with_gemini(
-            theme=theme,
-            products_involved=products,
-            required_skills=required_skills,
-            customer_industry=project_industry,
-            complexity=project_complexity,
-            original_summary=proj_template["Project Summary"],
-            original_scope=proj_template["Scope and Deliverables"]
-        )
+        products = introduce_typos_batch(take_sample(theme_products, product_perms[i], n_products[i]), product_typos[i], product_typo_pos[i])
+        skills = introduce_typos_batch(take_sample(theme_skills, skill_perms[i], n_skills[i]), skill_typos[i], skill_typo_pos[i])
+        required_skills = {skill: level for skill, level in zip(skills, skill_levels[i])}
+        certifications = take_sample(theme_certifications, certification_perms[i], n_certifications[i])
+        expertise = take_sample(theme_expertise, expertise_perms[i], n_expertise[i])
+        project_industry = project_industries[i]
+        project_complexity = complexity[i]
+        work_location = work_locations[i]
+        languages = introduce_typos_batch(take_sample(languages_master, language_perms[i], n_languages[i]), language_typos[i], language_typo_pos[i])
+
+        gemini_requests.append({
+            "theme": theme,
+            "products_involved": products,
+            "required_skills": required_skills,
+            "customer_industry": project_industry,
+            "complexity": project_complexity,
+            "original_summary": proj_template["Project Summary"],
+            "original_scope": proj_template["Scope and Deliverables"]
+        })
 
         project = {
-            "ProjectID": f"P{i+1:03d}", # Padded ID
-            "Project Summary": gemini_details["Project Summary"],
-            "Scope and Deliverables": gemini_details["Scope and Deliverables"],
+            "ProjectID": record_ids[i],
+            "Project Summary": None, # Filled in below from Gemini's output
+            "Scope and Deliverables": None,
             "Theme": theme,
             "Products Involved": products,
             "Required Skills and Expertise": required_skills,
             "Customer Preferences (Certifications)": certifications,
             "Integration Requirements (Expertise Areas)": expertise,
             "Customer Industry": project_industry,
-            "Work Location": introduce_typo(random.choice(locations_master)) if random.random() < 0.3 else random.choice(locations_master),
-            "Work Flexibility": random.choice(work_flexibility_options),
-            "Languages Required": {introduce_typo(lang) if random.random() < 0.3 else lang: random.choice(fluency_levels)
-                                   for lang in random.sample(languages_master, k=random.randint(1, 3))},
+            "Work Location": work_location,
+            "Work Flexibility": work_flexibility_options[flexibility_idx[i]],
+            "Languages Required": {lang: fluency_levels[fluency_idx[i][j]] for j, lang in enumerate(languages)},
             "Complexity": project_complexity,
-            "Effort": random.choice(list(range(20, 241, 10))),
-            "Requested End": datetime.now().date() + timedelta(days=random.randint(30, 150))
+            "Effort": effort_hours[i],
+            "Requested End": today + timedelta(days=end_in_days[i])
         }
         projects.append(project)
-    return pd.DataFrame(projects)
+    return projects, gemini_requests
+
+def generate_smart_projects_full(n, num_workers=None):
+    # Build the records in parallel chunks (pure Python/NumPy work), then make the Gemini calls from this process only
+    projects, gemini_requests = build_records_in_chunks(_build_project_chunk, n, num_workers)
+
+    # Generate Project Summary and Scope using Gemini, with many requests in flight and one call per distinct prompt instead of one serial call per project
+    all_gemini_details = run_deduplicated(generate_project_details_with_gemini, gemini_requests, key_func=build_project_details_prompt)
+    for project, gemini_details in zip(projects, all_gemini_details):
+        project["Project Summary"] = gemini_details["Project Summary"]
+        project["Scope and Deliverables"] = gemini_details["Scope and Deliverables"]
+    return projects
 
 if __name__ == "__main__":
     num_projects_to_generate = 100
     print(f"Generating {num_projects_to_generate} project records...")
 
-    if not GEMINI_API_KEY or not model:
+    if not get_model(GEMINI_API_KEY):
         print("Exiting: Gemini API key not configured. Please check your .env file.")
     else:
-        projects_df = generate_smart_projects_full(num_projects_to_generate)
-        print("\nGenerated Project Data:")
-        print(projects_df)
+        projects = generate_smart_projects_full(num_projects_to_generate)
+        print(f"\nGenerated {len(projects)} project records. First record:")
+        print(projects[0] if projects else "N/A")
         
         # Save to CSV
         csv_output_path = "generated_projects.csv"
-        projects_df.to_csv(csv_output_path, index=False)
+        write_records_csv(projects, csv_output_path)
         print(f"\nProject data saved to {csv_output_path}")
 
         # Save to JSON
         json_output_path = "generated_projects.json"
-        projects_df.to_json(json_output_path, orient="records", indent=4)
+        write_records_json(projects, json_output_path)
         print(f"Project data saved to {json_output_path}")
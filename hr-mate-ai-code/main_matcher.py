@@ -1,5 +1,7 @@
-import json
+import logging
 import os
+from collections import ChainMap
+import orjson
 from retriever import initialize_retriever_system
 from scorer import generate_detailed_scores_for_candidates, score_employee_against_project
 from config import (CHROMA_DB_PATH, CHROMA_COLLECTION_NAME, 
@@ -7,6 +9,8 @@ from config import (CHROMA_DB_PATH, CHROMA_COLLECTION_NAME,
                     PROJECT_DATA_PATH, DEFAULT_TOP_N_CANDIDATES,
                     SCORED_EMPLOYEE_DATA_PATH) # Added SCORED_EMPLOYEE_DATA_PATH
 
+logger = logging.getLogger(__name__)
+
 # Configuration is now imported from config.py
 # TOP_N_CANDIDATES is now DEFAULT_TOP_N_CANDIDATES from config
 
@@ -16,9 +20,9 @@ def load_json_data(file_path):
         print(f"Error: File not found at {file_path}")
         return None
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except orjson.JSONDecodeError as e:
         print(f"Error decoding JSON from {file_path}: {e}")
         return None
     except Exception as e:
@@ -89,12 +93,11 @@ def main():
         emp_id = candidate['employee'].get('EmployeeID')
         similarity = candidate.get('similarity_score', 0.0) # Get similarity_score from retriever output
         if emp_id and emp_id in all_employees_map:
-            employee_record = all_employees_map[emp_id].copy() # Get a copy to modify
-            employee_record['document_score'] = similarity # Add the similarity score
-            candidate_employees_for_scoring.append(employee_record)
-            print(f"  - Fetched details for {emp_id}, Similarity: {similarity:.4f}")
+            # Shadow the source record with its document_score in a ChainMap instead of copying it
+            candidate_employees_for_scoring.append(ChainMap({'document_score': similarity}, all_employees_map[emp_id]))
+            logger.debug("  - Fetched details for %s, Similarity: %.4f", emp_id, similarity)
         else:
-            print(f"  - Warning: Could not find full details for EmployeeID: {emp_id} from retriever output.")
+            logger.warning("  - Could not find full details for EmployeeID: %s from retriever output.", emp_id)
     
     if not candidate_employees_for_scoring:
         print(f"No valid candidate details found for scoring. Exiting.")
@@ -129,16 +132,22 @@ def main():
 
     # Save the detailed scores data to a file
     if detailed_scores_data:
+        # Write to a temp file and swap it in, so a crash mid-write never leaves a truncated scores file
+        temp_output_path = SCORED_EMPLOYEE_DATA_PATH + '.tmp'
         try:
-            with open(SCORED_EMPLOYEE_DATA_PATH, 'w', encoding='utf-8') as f:
-                json.dump(detailed_scores_data, f, indent=4)
+            with open(temp_output_path, 'wb') as f:
+                f.write(orjson.dumps(detailed_scores_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+            os.replace(temp_output_path, SCORED_EMPLOYEE_DATA_PATH)
             print(f"\nSuccessfully saved detailed scores for {len(detailed_scores_data)} candidates to {SCORED_EMPLOYEE_DATA_PATH}")
-        except IOError as e:
+        except (OSError, orjson.JSONEncodeError) as e: # JSONEncodeError: a Details value orjson cannot serialize
             print(f"\nError saving scores to {SCORED_EMPLOYEE_DATA_PATH}: {e}")
+            if os.path.exists(temp_output_path):
+                os.remove(temp_output_path) # Don't leave a partial temp file behind
     else:
         print("\nNo scores generated, so nothing to save.")
 
     print("\nEmployee-Project Matcher finished.")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s") # Set level=logging.DEBUG for per-candidate lines
     main()
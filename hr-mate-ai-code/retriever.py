@@ -1,47 +1,80 @@
-import json
+import hashlib
+import logging
+import threading
+import time
+import numpy as np
+import orjson
+from cachetools import LRUCache, TTLCache
 from sentence_transformers import SentenceTransformer
 import torch
 import os
 import chromadb
 from chromadb.utils import embedding_functions
 
+logger = logging.getLogger(__name__)
+
+# Use every core for intra-op parallelism when encoding (override with TORCH_NUM_THREADS)
+torch.set_num_threads(int(os.environ.get('TORCH_NUM_THREADS', os.cpu_count() or 1)))
+try:
+    torch.set_num_interop_threads(2)
+except RuntimeError:
+    pass # Can only be set once per process, before any inter-op parallel work has started
+
 # --- Constants ---
 DEFAULT_EMPLOYEE_DATA_PATH = 'generated_employees.json'
 DEFAULT_MODEL_NAME = 'BAAI/bge-large-en-v1.5'
 DEFAULT_CHROMA_DB_PATH = './chroma_db'
 DEFAULT_COLLECTION_NAME = 'employee_profiles'
+# For BGE models, this instruction is prepended to the query for retrieval tasks (corpus texts are embedded without it)
+BGE_QUERY_INSTRUCTION = "Represent this sentence for searching relevant passages: "
+EMBEDDING_BATCH_SIZE = 1024 # Texts per forward pass when embedding the whole corpus
+# Multi-process corpus encoding (one worker per GPU) only pays off for large corpora on multi-GPU machines
+MULTI_PROCESS_MIN_TEXTS = 5000
+MULTI_PROCESS_ENCODE_BATCH_SIZE = 256 # Per-worker batch size
+MULTI_PROCESS_ADD_BATCH_SIZE = 4096 # Texts handed to the pool at once (stays under Chroma's max add() batch)
+DELETE_BATCH_SIZE = 10000 # IDs per delete() call when a collection has to be cleared in place
+# HNSW index settings for the collection (cosine space; M = graph connectivity, ef = candidate list sizes)
+HNSW_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 100 # High enough for ~0.99 recall at our collection sizes
+}
+# Collection metadata key recording which model/backend/precision embedded the stored vectors (e.g. "<model>:onnx-int8")
+EMBEDDING_VARIANT_METADATA_KEY = "embedding:variant"
+# Retrieval result caching (exact query text, then semantically near-identical queries)
+RETRIEVAL_CACHE_MAXSIZE = 512
+RETRIEVAL_CACHE_TTL_SECONDS = 7 * 24 * 3600
+SEMANTIC_CACHE_SIMILARITY_THRESHOLD = 0.97 # Cosine similarity above which a cached query's results are reused
+# CPU query encoding through ONNX Runtime with a dynamically INT8-quantized copy of the model (built once, then reused)
+DEFAULT_ONNX_MODEL_DIR = './onnx_models'
+ONNX_QUANTIZATION_CONFIG = 'avx512_vnni' # Sentence Transformers preset: "avx512_vnni", "avx512", "avx2" or "arm64"
 
 # --- Helper Functions ---
 def load_employee_data(file_path):
-    """Loads employee data from a JSON file."""
+    """Loads employee data from a JSON file in a single orjson parse (the record count is then just len())."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
         print(f"Successfully loaded {len(data)} employee records from {file_path}")
         return data
     except FileNotFoundError:
         print(f"Error: Employee data file not found at {file_path}")
         return []
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Error: Could not decode JSON from {file_path}")
         return []
 
 def preprocess_employee_text_for_corpus(employees):
     """Combines 'Role Name' and 'Role Description' for each employee for corpus embedding."""
-    employee_texts = []
-    for emp in employees:
-        role_name = emp.get('Role Name', '')
-        role_description = emp.get('Role Description', '')
-        combined_text = f"{role_name}. {role_description}"
-        employee_texts.append(combined_text)
-    return employee_texts
+    return [f"{emp.get('Role Name', '')}. {emp.get('Role Description', '')}" for emp in employees]
 
 def _prepare_metadata_for_chroma(employee_record):
     """Converts list/dict fields in an employee record to JSON strings for ChromaDB compatibility."""
     processed_metadata = {}
     for key, value in employee_record.items():
         if isinstance(value, (list, dict)):
-            processed_metadata[key] = json.dumps(value)
+            processed_metadata[key] = orjson.dumps(value).decode('utf-8') # Chroma metadata values must be str
         elif value is None:
             processed_metadata[key] = '' # Handle None as empty string or based on schema
         elif not isinstance(value, (str, int, float, bool)):
@@ -50,56 +83,277 @@ def _prepare_metadata_for_chroma(employee_record):
             processed_metadata[key] = value
     return processed_metadata
 
-def populate_chroma_collection_if_needed(collection, employees_data_list, force_repopulate=False):
-    """Populates the ChromaDB collection if it's empty, data count differs, or force_repopulate is True."""
-    current_count = collection.count()
-    target_count = len(employees_data_list)
+def load_onnx_int8_query_model(model_name, onnx_model_dir=DEFAULT_ONNX_MODEL_DIR):
+    """
+    Loads model_name as an INT8-quantized ONNX Runtime SentenceTransformer for CPU inference.
+    On first use the model is exported to ONNX and quantized into onnx_model_dir; later runs load the saved file.
+    Pooling and normalization stay as configured for the model, so embeddings are comparable to the PyTorch ones.
+    """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
 
-    if not force_repopulate and current_count == target_count and current_count > 0:
-        print(f"ChromaDB collection '{collection.name}' is already populated with {current_count} items and matches source count. No repopulation needed.")
-        return
+    local_model_path = os.path.join(onnx_model_dir, model_name.replace('/', '__'))
+    quantized_file_name = f"onnx/model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx"
+    if not os.path.exists(os.path.join(local_model_path, quantized_file_name)):
+        print(f"Exporting {model_name} to ONNX and quantizing to INT8 ({ONNX_QUANTIZATION_CONFIG}) in {local_model_path}...")
+        onnx_model = SentenceTransformer(model_name, device='cpu', backend='onnx')
+        onnx_model.save(local_model_path)
+        export_dynamic_quantized_onnx_model(onnx_model, ONNX_QUANTIZATION_CONFIG, local_model_path)
 
-    if force_repopulate:
-        print(f"Force repopulate is True. Clearing and repopulating collection '{collection.name}'.")
-    elif current_count != target_count:
-        print(f"ChromaDB collection '{collection.name}' has {current_count} items, but source has {target_count}. Repopulating...")
-    
-    if current_count > 0:
-        print(f"Clearing existing items from collection '{collection.name}' before repopulating.")
-        existing_ids = collection.get(include=[])['ids']
-        if existing_ids:
-            collection.delete(ids=existing_ids)
-            print(f"Deleted {len(existing_ids)} items.")
+    return SentenceTransformer(
+        local_model_path,
+        device='cpu',
+        backend='onnx',
+        model_kwargs={"file_name": quantized_file_name, "provider": "CPUExecutionProvider"}
+    )
 
-    corpus_texts = preprocess_employee_text_for_corpus(employees_data_list)
-    
-    batch_size = 100
-    for i in range(0, len(employees_data_list), batch_size):
-        batch_employees = employees_data_list[i:i+batch_size]
-        batch_corpus_texts = corpus_texts[i:i+batch_size]
+class QueryModelEmbeddingFunction(embedding_functions.EmbeddingFunction):
+    """
+    Chroma embedding function backed by the already-loaded query model, so documents added without vectors are
+    embedded exactly like the corpus (same model, backend and precision as the queries are compared against).
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, input):
+        return encode_corpus_texts(self.model, list(input))
+
+def embedding_variant_name(model_name, query_model):
+    """Names the embedding variant of a loaded query model, e.g. 'BAAI/bge-large-en-v1.5:onnx-int8' or '...:torch-fp16'."""
+    if getattr(query_model, 'backend', 'torch') == 'onnx':
+        return f"{model_name}:onnx-int8"
+    precision = 'fp16' if next(query_model.parameters()).dtype == torch.float16 else 'fp32'
+    return f"{model_name}:torch-{precision}"
+
+def encode_corpus_texts(embedding_model, corpus_texts, batch_size=EMBEDDING_BATCH_SIZE, pool=None):
+    """
+    Embeds a batch of corpus texts in a single SentenceTransformer.encode call.
+    encode() already sorts the texts by length internally (smart batching), so large batches waste little on padding;
+    embeddings are returned in the original order, L2-normalized.
+    With a pool from start_multi_process_pool(), the texts are split across its worker processes instead.
+    """
+    if pool is not None:
+        return embedding_model.encode_multi_process(
+            corpus_texts, pool, batch_size=MULTI_PROCESS_ENCODE_BATCH_SIZE, normalize_embeddings=True
+        )
+    return embedding_model.encode(
+        corpus_texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=True
+    )
+
+def _clear_collection(collection, client=None, embedding_function=None):
+    """
+    Empties the collection before a repopulate and returns the collection to use afterwards.
+    With a client, the collection is dropped and re-created with the same name (no ID round-trip). It keeps its
+    metadata (including the embedding variant) with the current HNSW_COLLECTION_METADATA applied, so a forced
+    repopulate also applies the index tuning to a collection created before it;
+    otherwise its IDs are fetched and deleted in pages of DELETE_BATCH_SIZE.
+    """
+    if client is not None:
+        collection_name = collection.name
+        collection_metadata = {**(collection.metadata or {}), **HNSW_COLLECTION_METADATA}
+        client.delete_collection(collection_name)
+        print(f"Dropped collection '{collection_name}'; re-creating it empty.")
+        return client.get_or_create_collection(
+            name=collection_name,
+            embedding_function=embedding_function,
+            metadata=collection_metadata
+        )
+
+    deleted_count = 0
+    while True:
+        page_ids = collection.get(include=[], limit=DELETE_BATCH_SIZE)['ids']
+        if not page_ids:
+            break
+        collection.delete(ids=page_ids)
+        deleted_count += len(page_ids)
+    print(f"Deleted {deleted_count} items.")
+    return collection
+
+def _add_employees_in_batches(collection, employees_data, batch_size, embedding_model=None, pool=None):
+    """Adds employees_data in batches of batch_size, embedding each batch (if a model is given) before adding it to the collection."""
+    for i in range(0, len(employees_data), batch_size):
+        batch_employees = employees_data[i:i+batch_size]
+        batch_corpus_texts = preprocess_employee_text_for_corpus(batch_employees)
+        batch_embeddings = encode_corpus_texts(embedding_model, batch_corpus_texts, pool=pool) if embedding_model is not None else None
         
         current_batch_docs = []
         current_batch_metadatas = []
         current_batch_ids = []
+        current_batch_embeddings = []
 
-        for emp, text_content in zip(batch_employees, batch_corpus_texts):
+        for j, (emp, text_content) in enumerate(zip(batch_employees, batch_corpus_texts)):
             employee_id = emp.get('EmployeeID')
             if not employee_id:
-                print(f"Warning: Employee record missing 'EmployeeID', skipping: {emp}")
+                logger.warning("Employee record missing 'EmployeeID', skipping: %s", emp) # Formatted only if emitted
                 continue
             current_batch_docs.append(text_content)
             current_batch_metadatas.append(_prepare_metadata_for_chroma(emp))
             current_batch_ids.append(employee_id)
+            if batch_embeddings is not None:
+                current_batch_embeddings.append(batch_embeddings[j].tolist())
         
         if current_batch_ids:
             # print(f"Adding batch of {len(current_batch_ids)} employees to ChromaDB...")
             collection.add(
                 documents=current_batch_docs,
                 metadatas=current_batch_metadatas,
-                ids=current_batch_ids
+                ids=current_batch_ids,
+                embeddings=current_batch_embeddings or None # None: let Chroma's embedding function embed the documents
             )
+
+def populate_chroma_collection_if_needed(collection, employees_data, force_repopulate=False, embedding_model=None,
+                                         client=None, embedding_function=None):
+    """
+    Populates the ChromaDB collection if it's empty, data count differs, or force_repopulate is True.
+    Records are added batch by batch. If embedding_model is given, each batch is embedded in one large encode call
+    and the vectors are passed to Chroma, so the collection's embedding function isn't invoked.
+    Pass the client (and the collection's embedding_function) to clear by drop-and-recreate instead of deleting IDs.
+    Returns the populated collection, which is a new object if it was re-created.
+    """
+    current_count = collection.count()
+    target_count = len(employees_data)
+
+    if not force_repopulate and current_count == target_count and current_count > 0:
+        print(f"ChromaDB collection '{collection.name}' is already populated with {current_count} items and matches source count. No repopulation needed.")
+        return collection
+
+    if force_repopulate:
+        print(f"Force repopulate is True. Clearing and repopulating collection '{collection.name}'.")
+    elif current_count != target_count:
+        print(f"ChromaDB collection '{collection.name}' has {current_count} items, but source has {target_count}. Repopulating...")
+    
+    if current_count > 0:
+        print(f"Clearing existing items from collection '{collection.name}' before repopulating.")
+        collection = _clear_collection(collection, client, embedding_function)
+
+    pool = None
+    if embedding_model is not None and target_count >= MULTI_PROCESS_MIN_TEXTS and torch.cuda.device_count() > 1:
+        print(f"Encoding {target_count} texts across {torch.cuda.device_count()} GPUs with a multi-process pool.")
+        pool = embedding_model.start_multi_process_pool()
+    try:
+        if pool is not None:
+            batch_size = MULTI_PROCESS_ADD_BATCH_SIZE
+        else:
+            batch_size = EMBEDDING_BATCH_SIZE if embedding_model is not None else 100
+        _add_employees_in_batches(collection, employees_data, batch_size, embedding_model, pool)
+    finally:
+        if pool is not None:
+            embedding_model.stop_multi_process_pool(pool)
     final_count = collection.count()
     print(f"Successfully populated ChromaDB collection '{collection.name}' with {final_count} items.")
+    return collection
+
+def open_collection_for_variant(client, collection_name, embedding_function, embedding_variant):
+    """
+    Gets or creates the collection for the given embedding variant. A collection whose stored vectors came from
+    another variant (or from an embedding function persisted by an older setup) is dropped and re-created empty,
+    so it gets repopulated instead of comparing queries against vectors from a different model or precision.
+    """
+    try:
+        # No metadata here, so an existing collection's recorded variant is read back rather than overwritten
+        collection = client.get_or_create_collection(name=collection_name, embedding_function=embedding_function)
+        stored_variant = (collection.metadata or {}).get(EMBEDDING_VARIANT_METADATA_KEY)
+    except ValueError as e: # Chroma refuses to swap an embedding function persisted with the collection
+        if "Embedding function" not in str(e):
+            raise
+        print(f"Collection '{collection_name}' was created with another embedding function ({e}).")
+        stored_variant = None
+    if stored_variant == embedding_variant:
+        return collection
+
+    print(f"Collection '{collection_name}' is not tagged with embedding variant '{embedding_variant}' (found: {stored_variant}). Re-creating it.")
+    client.delete_collection(collection_name)
+    collection_metadata = {**HNSW_COLLECTION_METADATA, EMBEDDING_VARIANT_METADATA_KEY: embedding_variant}
+    return client.get_or_create_collection(
+        name=collection_name,
+        embedding_function=embedding_function,
+        metadata=collection_metadata
+    )
+
+# --- Retrieval Caches ---
+def _clone_retrieved_items(retrieved_items, top_n):
+    """Copies the cached result list (and its item dicts) so callers can't mutate the cache."""
+    return [dict(item) for item in retrieved_items[:top_n]]
+
+def _build_retrieved_items(metadatas, distances):
+    """Builds the ranked result items from metadatas and cosine distances (already sorted by ascending distance)."""
+    distances = np.asarray(distances, dtype=np.float64)
+    similarity_scores = (1.0 - distances).tolist() # Chroma's cosine distance is 1 - similarity
+    return [
+        {
+            "employee": metadata,
+            "similarity_score": similarity_score,
+            "distance": distance,
+            "rank": rank
+        }
+        for rank, (metadata, similarity_score, distance) in enumerate(
+            zip(metadatas, similarity_scores, distances.tolist()), start=1
+        )
+    ]
+
+def _rescore_retrieved_items(retrieved_items, item_embeddings, query_embedding):
+    """
+    Re-scores cached result items against a new (normalized) query embedding and re-ranks them, so a semantic cache
+    hit reuses only the candidate set and never reports similarities computed for the other query.
+    """
+    if not retrieved_items:
+        return []
+    similarities = item_embeddings.astype(np.float64) @ np.asarray(query_embedding, dtype=np.float64)
+    order = np.argsort(-similarities, kind='stable')
+    return _build_retrieved_items([retrieved_items[i]["employee"] for i in order], 1.0 - similarities[order])
+
+class SemanticQueryCache:
+    """
+    LRU/TTL cache of retrieval results keyed by the (L2-normalized) query embedding.
+    A lookup hits when a live entry retrieved at least top_n items and its query embedding has cosine similarity
+    >= threshold with the new one. Embeddings live in one preallocated matrix, so a lookup is a single matrix-vector product.
+    Each entry also keeps its result items' embeddings, so a hit can be re-scored against the new query.
+    """
+    def __init__(self, maxsize=RETRIEVAL_CACHE_MAXSIZE, threshold=SEMANTIC_CACHE_SIMILARITY_THRESHOLD, ttl=RETRIEVAL_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._embeddings = None # (maxsize, dim) matrix, allocated on first store
+            self._top_n = np.zeros(self.maxsize, dtype=np.int64) # 0 marks a free slot
+            self._expires_at = np.zeros(self.maxsize)
+            self._last_used = np.zeros(self.maxsize)
+            self._results = [None] * self.maxsize # (retrieved_items, item_embeddings) per slot
+
+    def lookup(self, query_embedding, top_n):
+        with self._lock:
+            if self._embeddings is None:
+                return None
+            now = time.monotonic()
+            similarities = self._embeddings @ query_embedding
+            usable = (self._top_n >= top_n) & (self._expires_at > now)
+            similarities[~usable] = -np.inf
+            slot = int(np.argmax(similarities))
+            if similarities[slot] < self.threshold:
+                return None
+            self._last_used[slot] = now
+            return self._results[slot]
+
+    def store(self, query_embedding, top_n, retrieved_items, item_embeddings):
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.maxsize, query_embedding.shape[0]), dtype=np.float32)
+            now = time.monotonic()
+            # Reuse a free or expired slot if there is one, otherwise evict the least recently used entry
+            stale_slots = np.flatnonzero(self._expires_at <= now)
+            slot = int(stale_slots[0]) if stale_slots.size else int(np.argmin(self._last_used))
+            self._embeddings[slot] = query_embedding
+            self._top_n[slot] = max(top_n, 1)
+            self._expires_at[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._results[slot] = (retrieved_items, item_embeddings)
 
 # --- Retriever Class ---
 class EmployeeRetriever:
@@ -107,49 +361,86 @@ class EmployeeRetriever:
         self.collection = collection
         self.query_model = query_model
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        # Exact tier: blake2b(query text) + top_n -> results; semantic tier: near-duplicate query embeddings -> results
+        self._exact_cache = TTLCache(maxsize=RETRIEVAL_CACHE_MAXSIZE, ttl=RETRIEVAL_CACHE_TTL_SECONDS)
+        self._exact_cache_lock = threading.Lock()
+        # Query text -> embedding, so the same query asked with a different top_n isn't tokenized and encoded again
+        self._query_embedding_cache = LRUCache(maxsize=RETRIEVAL_CACHE_MAXSIZE)
+        self._semantic_cache = SemanticQueryCache()
+        self._count_cache = collection.count() # Item count, cached to avoid a COUNT(*) round-trip per query
+
+    def invalidate_count(self):
+        """Re-reads the collection's item count (call after the collection's contents change)."""
+        self._count_cache = self.collection.count()
+
+    def clear_cache(self):
+        """Drops all cached retrieval results and refreshes the item count (call after the collection's contents change)."""
+        with self._exact_cache_lock:
+            self._exact_cache.clear()
+            self._query_embedding_cache.clear()
+        self._semantic_cache.clear()
+        self.invalidate_count()
 
     def retrieve_top_n_employees(self, project_query, top_n=50):
-        """Retrieves the top N most similar employees from ChromaDB for a given project query."""
-        if self.collection.count() == 0:
+        """Retrieves the top N most similar employees from ChromaDB for a given project query (cached)."""
+        if self._count_cache == 0:
             print("Warning: ChromaDB collection is empty. Cannot retrieve.")
             return []
 
-        # For BGE models, instruction is added to the query for retrieval tasks
-        query_with_instruction = f"Represent this sentence for searching relevant passages: {project_query}"
+        exact_key = (hashlib.blake2b(project_query.encode('utf-8')).hexdigest(), top_n)
+        with self._exact_cache_lock:
+            cached_items = self._exact_cache.get(exact_key)
+        if cached_items is not None:
+            return _clone_retrieved_items(cached_items, top_n)
+
+        project_embedding = self._encode_query(project_query, exact_key[0])
+
+        semantic_hit = self._semantic_cache.lookup(project_embedding, top_n)
+        if semantic_hit is None:
+            retrieved_items, item_embeddings = self._query_collection(project_embedding, top_n)
+            self._semantic_cache.store(project_embedding, top_n, retrieved_items, item_embeddings)
+        else:
+            # Near-duplicate query: reuse its candidates, but score them against this query's own embedding
+            retrieved_items = _rescore_retrieved_items(*semantic_hit, project_embedding)
+        with self._exact_cache_lock:
+            self._exact_cache[exact_key] = retrieved_items
+        return _clone_retrieved_items(retrieved_items, top_n)
+
+    def _encode_query(self, project_query, query_hash):
+        """Embeds the instruction-prefixed query, reusing the embedding if this exact query text was encoded before."""
+        with self._exact_cache_lock:
+            project_embedding = self._query_embedding_cache.get(query_hash)
+        if project_embedding is not None:
+            return project_embedding
+
         # print(f"Generating embedding for project query: '{project_query[:100]}...' (with instruction)")
-        
-        project_embedding = self.query_model.encode(query_with_instruction, device=self.device).tolist()
+        with torch.inference_mode(): # No autograd bookkeeping for inference
+            project_embedding = self.query_model.encode(
+                BGE_QUERY_INSTRUCTION + project_query, device=self.device, convert_to_numpy=True, normalize_embeddings=True
+            )
+        with self._exact_cache_lock:
+            self._query_embedding_cache[query_hash] = project_embedding
+        return project_embedding
 
+    def _query_collection(self, project_embedding, top_n):
+        """
+        Runs the nearest-neighbour query against ChromaDB and builds the result items.
+        Returns (retrieved_items, item_embeddings); the embeddings let the semantic cache re-score the items later.
+        """
         # print("Querying ChromaDB...")
         results = self.collection.query(
             query_embeddings=[project_embedding],
-            n_results=min(top_n, self.collection.count()),
-            include=["metadatas", "documents", "distances"]
+            n_results=min(top_n, self._count_cache),
+            include=["metadatas", "distances", "embeddings"] # Documents aren't used downstream, so don't fetch them
         )
 
-        retrieved_items = []
-        if results and results['ids'] and results['ids'][0]:
-            # print(f"Top {len(results['ids'][0])} retrieval results from ChromaDB:")
-            for i in range(len(results['ids'][0])):
-                metadata = results['metadatas'][0][i]
-                distance = results['distances'][0][i]
-                document_text = results['documents'][0][i] if results.get('documents') and results['documents'][0] else "N/A"
-                
-                similarity_score = 1 - distance # Chroma's cosine distance is 1 - similarity
-                
-                retrieved_items.append({
-                    "employee": metadata,
-                    "similarity_score": similarity_score,
-                    "distance": distance,
-                    "rank": i + 1,
-                    "document_text": document_text
-                })
-        else:
+        if not (results and results['ids'] and results['ids'][0]):
             print("No results returned from ChromaDB query.")
-        
-        # Sort by similarity score descending (as higher similarity is better)
-        retrieved_items.sort(key=lambda x: x['similarity_score'], reverse=True)
-        return retrieved_items
+            return [], None
+
+        # No re-sort needed: Chroma returns results by ascending distance, i.e. descending similarity
+        retrieved_items = _build_retrieved_items(results['metadatas'][0], results['distances'][0])
+        return retrieved_items, np.asarray(results['embeddings'][0], dtype=np.float32)
 
 # --- Initialization Function --- 
 def initialize_retriever_system(
@@ -157,7 +448,8 @@ def initialize_retriever_system(
     chroma_db_path=DEFAULT_CHROMA_DB_PATH,
     collection_name=DEFAULT_COLLECTION_NAME,
     employee_data_path=None, # Path to employee data for populating if needed
-    force_repopulate=False     # Force repopulation even if counts match
+    force_repopulate=False,    # Force repopulation even if counts match
+    use_onnx_on_cpu=True       # Encode queries with the INT8 ONNX Runtime model when no GPU is available
 ):
     """Initializes the full retriever system including model and ChromaDB."""
     print("Initializing retriever system...")
@@ -165,29 +457,34 @@ def initialize_retriever_system(
     print(f"Using device: {device}")
 
     print(f"Loading sentence transformer model: {model_name_for_embedding} for query embedding")
-    try:
-        query_model = SentenceTransformer(model_name_for_embedding, device=device)
-        print("Query model loaded successfully.")
-    except Exception as e:
-        print(f"Error loading query model {model_name_for_embedding}: {e}")
-        return None
+    query_model = None
+    if device == 'cpu' and use_onnx_on_cpu:
+        try:
+            query_model = load_onnx_int8_query_model(model_name_for_embedding)
+            print("Query model loaded successfully (ONNX Runtime, INT8).")
+        except Exception as e:
+            print(f"Could not load ONNX INT8 query model ({e}). Falling back to PyTorch.")
+    if query_model is None:
+        try:
+            query_model = SentenceTransformer(model_name_for_embedding, device=device)
+            if device == 'cuda':
+                query_model = query_model.half() # FP16 weights/activations: half the memory traffic, Tensor Cores on Ampere+
+            print("Query model loaded successfully.")
+        except Exception as e:
+            print(f"Error loading query model {model_name_for_embedding}: {e}")
+            return None
 
     print(f"Initializing ChromaDB client with path: {chroma_db_path}")
     try:
         client = chromadb.PersistentClient(path=chroma_db_path)
         
-        print(f"Setting up ChromaDB embedding function with model: {model_name_for_embedding}")
-        chroma_embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=model_name_for_embedding,
-            device=device
-        )
+        # Documents are embedded by the query model itself, so corpus and query vectors always share one variant
+        embedding_variant = embedding_variant_name(model_name_for_embedding, query_model)
+        print(f"Setting up ChromaDB embedding function with the query model ({embedding_variant})")
+        chroma_embedding_function = QueryModelEmbeddingFunction(query_model)
         
         print(f"Getting or creating ChromaDB collection: {collection_name}")
-        collection = client.get_or_create_collection(
-            name=collection_name,
-            embedding_function=chroma_embedding_function,
-            metadata={"hnsw:space": "cosine"}
-        )
+        collection = open_collection_for_variant(client, collection_name, chroma_embedding_function, embedding_variant)
         print(f"Collection '{collection.name}' ready with {collection.count()} items.")
 
     except Exception as e:
@@ -199,7 +496,10 @@ def initialize_retriever_system(
         print(f"Employee data path provided: {employee_data_path}. Checking population status.")
         employees_list = load_employee_data(employee_data_path)
         if employees_list:
-            populate_chroma_collection_if_needed(collection, employees_list, force_repopulate=force_repopulate)
+            collection = populate_chroma_collection_if_needed(
+                collection, employees_list, force_repopulate=force_repopulate, embedding_model=query_model,
+                client=client, embedding_function=chroma_embedding_function
+            )
         else:
             print(f"Could not load employee data from {employee_data_path}. Collection may not be populated as expected.")
     
@@ -244,16 +544,15 @@ if __name__ == '__main__':
             role_desc_raw = emp_metadata.get('Role Description', '')
             if isinstance(role_desc_raw, str):
                 try:
-                    parsed_desc = json.loads(role_desc_raw) 
+                    parsed_desc = orjson.loads(role_desc_raw)
                     role_desc = parsed_desc if isinstance(parsed_desc, str) else role_desc_raw
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     role_desc = role_desc_raw
             else:
                 role_desc = str(role_desc_raw)
             
             print(f"    Role Description (first 100 chars): {role_desc[:100]}...")
             print(f"    Similarity Score: {item['similarity_score']:.4f} (Distance: {item['distance']:.4f})")
-            # print(f"    Embedded Text (from Chroma): {item.get('document_text', 'N/A')[:100]}...")
             print("  ----")
     else:
         print("No employees retrieved for the sample query in __main__.")
@@ -1,8 +1,11 @@
+import functools
 import streamlit as st
 import pandas as pd # Added
+import numpy as np
 import re
-import json
-import plotly.express as px
+import html
+import orjson # Faster parsing of JSON-stringified list fields
+import plotly.graph_objects as go
 from datetime import datetime as dt_datetime, timedelta
 from dateutil import parser as date_parser
 import os # Ensure os is imported if used for css_file_path
@@ -15,20 +18,37 @@ from config import (
     SCORING_WEIGHTS # Added
 )
 from retriever import initialize_retriever_system
-from scorer import generate_detailed_scores_for_candidates, fuzzy_match, fuzzy_match_threshold
-from fuzzywuzzy import fuzz # Added for direct ratio calculation
+from scorer import generate_detailed_scores_for_candidates
+from rapidfuzz import fuzz, process, utils # Added for direct ratio calculation
 
+_NUM_CLEAN_RE = re.compile(r"[^\d.]") # Everything but digits and the decimal point, stripped before a second float() attempt
 
-def create_radar_chart(scores_dict, score_names_map, scoring_weights_config):
-    """Creates a radar chart from the raw scores dictionary."""
-    data = []
-    # Consider scores that have a display name and are relevant (e.g., in SCORING_WEIGHTS or fundamental)
-    # Or, more simply, iterate through SCORE_DISPLAY_NAMES to ensure we only plot what's meant to be user-facing
-    for score_key, display_name in score_names_map.items():
-        # Only include scores that are part of the defined scoring system
-        if score_key not in scoring_weights_config and score_key != 'document_score': # 'document_score' is an alias for RetrieverScore sometimes
-            continue
 
+def _radar_metrics(score_names_map, scoring_weights_config):
+    """
+    (score key, display name) pairs plotted on the radar: the scores that have a display name and are part of the
+    defined scoring system ('document_score' is an alias for RetrieverScore sometimes).
+    """
+    return tuple(
+        (score_key, display_name) for score_key, display_name in score_names_map.items()
+        if score_key in scoring_weights_config or score_key == 'document_score'
+    )
+
+def create_radar_chart(scores_dict, score_names_map, scoring_weights_config):
+    """Creates a radar chart from the raw scores dictionary (cached per distinct scores/metrics)."""
+    if score_names_map is SCORE_DISPLAY_NAMES and scoring_weights_config is SCORING_WEIGHTS:
+        radar_metrics = _RADAR_METRICS # The app's static maps: filtered once at import
+    else:
+        radar_metrics = _radar_metrics(score_names_map, scoring_weights_config)
+    return _build_radar(tuple(sorted(scores_dict.items())), radar_metrics)
+
+@st.cache_resource(max_entries=256) # Re-viewing a candidate reuses its figure instead of rebuilding it with Plotly
+def _build_radar(scores_items, radar_metrics):
+    """Builds the radar chart Figure from the frozen (key, value) score items and the (key, display name) metrics to plot."""
+    scores_dict = dict(scores_items)
+    r_list = []
+    theta_list = []
+    for score_key, display_name in radar_metrics:
         raw_score = float(scores_dict.get(score_key, 0.0))
         # Special handling for RetrieverScore possibly being under 'document_score'
         if score_key == "RetrieverScore" and score_key not in scores_dict:
@@ -38,26 +58,23 @@ def create_radar_chart(scores_dict, score_names_map, scoring_weights_config):
         raw_score = min(raw_score, 1.0)
         raw_score = max(raw_score, 0.0) # Ensure non-negative for radar
 
-        data.append({'Metric': display_name, 'Score': raw_score})
+        r_list.append(raw_score)
+        theta_list.append(display_name)
 
-    if not data:
+    if not r_list:
         return None
 
-    df = pd.DataFrame(data)
-    if df.empty:
-        return None
-
-    fig = px.line_polar(df, r='Score', theta='Metric', line_close=True,
-                        range_r=[0,1],  # Scores are normalized or assumed to be 0-1
-                        title="Employee Score Profile")
-    fig.update_traces(fill='toself')
+    # Built directly as a trace (no DataFrame / Plotly Express round-trip); the first point is repeated to close the outline
+    fig = go.Figure(go.Scatterpolar(r=r_list + r_list[:1], theta=theta_list + theta_list[:1], mode='lines', fill='toself'))
     fig.update_layout(
         polar=dict(
             radialaxis=dict(
                 visible=True,
-                range=[0, 1]
-            )
+                range=[0, 1] # Scores are normalized or assumed to be 0-1
+            ),
+            angularaxis=dict(direction='clockwise', rotation=90) # Same orientation as px.line_polar
         ),
+        title="Employee Score Profile",
         showlegend=False,
         height=600,  # Increased height
         width=700,   # Added width
@@ -67,113 +84,122 @@ def create_radar_chart(scores_dict, score_names_map, scoring_weights_config):
     return fig
 
 
-# --- Attribute Comparison Configuration ---
-ATTRIBUTE_COMPARISON_CONFIG = [
-    {
-        "label": "Skills",
-        "score_key": "SkillMatchScore",
-        "project_key": "Required Skills and Expertise",      # Expected in project_details: dict, e.g., {"Python": 4}
-        "employee_key": "Core Competencies", # Expected in candidate_data: dict, e.g., {"Python": 5}
-        "render_function_name": "render_skills_comparison",
-    },
-    {
-        "label": "Products Experience",
-        "score_key": "ProductScore",
-        "project_key": "Products Involved",         # Expected: list of strings
-        "employee_key": "Products Experience",    # Expected: list of strings
-        "render_function_name": "render_list_comparison",
-        "item_name_singular": "Product",
-        "item_name_plural": "Products"
-    },
-    {
-        "label": "Certifications",
-        "score_key": "CertificationScore",
-        "project_key": "Customer Preferences (Certifications)",             # Expected: list of strings
-        "employee_key": "External/Internal Certifications", # Expected: list of strings
-        "render_function_name": "render_list_comparison",
-        "item_name_singular": "Certification",
-        "item_name_plural": "Certifications"
-    },
+# --- Status Row Styling ---
+# Row classes of the comparison tables; their colors are defined once in assets/custom.css
+_STYLE_STRONG_GREEN = 'status-strong-green'
+_STYLE_GREEN = 'status-green'
+_STYLE_YELLOW = 'status-yellow'
+_STYLE_RED = 'status-red'
+_STYLE_BLUE = 'status-blue' # Info / additional items
+_STYLE_GREY = 'status-grey' # Missing / unspecified data
+
+# (status marker, row class) per comparison table; a row takes the class of the first marker found in its status
+SKILL_STATUS_STYLES = (("✅ Exceeds", _STYLE_STRONG_GREEN), ("✔️ Meets", _STYLE_GREEN), ("⚠️ Below", _STYLE_YELLOW),
+                       ("❌ Missing", _STYLE_RED), ("✨ Additional", _STYLE_BLUE))
+LIST_STATUS_STYLES = (("✔️ Matched", _STYLE_GREEN), ("❌ Missing", _STYLE_RED), ("✨ Additional", _STYLE_BLUE))
+NUMERICAL_STATUS_STYLES = (("✅ Exceeds", _STYLE_STRONG_GREEN), ("✔️ Meets", _STYLE_GREEN), ("⚠️ Below", _STYLE_YELLOW),
+                           ("❓ Employee Data Missing/Invalid", _STYLE_GREY), ("ℹ️", _STYLE_BLUE))
+STRING_STATUS_STYLES = (("✔️ Matched", _STYLE_GREEN), ("⚠️ Mismatched", _STYLE_YELLOW),
+                        ("❓ Employee Data Missing/Not Specified", _STYLE_GREY), ("ℹ️", _STYLE_BLUE))
+MODALITY_STATUS_STYLES = (("✅ Compatible", _STYLE_GREEN), ("⚠️ Potentially Compatible", _STYLE_YELLOW), ("❌ Mismatch", _STYLE_RED),
+                          ("❓ Employee Preference Not Specified", _STYLE_GREY), ("ℹ️", _STYLE_BLUE))
+LANGUAGE_STATUS_STYLES = (("✔️ Meets/Exceeds", _STYLE_GREEN), ("⚠️ Below Proficiency", _STYLE_YELLOW), ("❌ Language Missing", _STYLE_RED),
+                          ("✨ Additional Language", _STYLE_BLUE), ("❓ Proficiency Unspecified", _STYLE_GREY))
+
+def _show_comparison_table(df, status_col, status_styles):
+    """
+    Emits df as one static HTML table (single markdown element, no st.dataframe grid or Styler), each row tagged with
+    the CSS class of its status_col value.
+    """
+    class_for_status = {}
+    header_html = "".join(f"<th>{html.escape(str(col))}</th>" for col in df.columns)
+    rows_html = []
+    for row, status in zip(df.itertuples(index=False, name=None), df[status_col]):
+        if status not in class_for_status:
+            class_for_status[status] = next((row_class for marker, row_class in status_styles if marker in status), '')
+        cells_html = "".join(f"<td>{html.escape(str(value))}</td>" for value in row)
+        rows_html.append(f'<tr class="{class_for_status[status]}">{cells_html}</tr>')
+    st.markdown(
+        f'<table class="comparison-table"><thead><tr>{header_html}</tr></thead><tbody>{"".join(rows_html)}</tbody></table>',
+        unsafe_allow_html=True
+    )
 
-    {
-        "label": "Availability & FTE",
-        "score_key": "AvailabilityScore", # Assumes scorer.py provides this
-        "render_function_name": "render_availability_comparison",
-        # These keys tell the render function what fields to look for in project_details and candidate_data
-        "detail_keys": {
-            "project_start": "Project Start Date", # Ensure this key is correct for your project data if applicable
-            "project_end": "Requested End",      # Mapped to project's 'Requested End' (timestamp)
-            "project_fte": "Effort",             # Mapped to project's 'Effort' (e.g., total hours)
-            "employee_from": "Available from", # e.g., "YYYY-MM-DD" or timestamp
-            "employee_until": "Available until",  # e.g., "YYYY-MM-DD", timestamp, or "Open"
-            "employee_fte_current": "Current FTE %" # e.g., "20%" or 20
-        }
-    },
-    {
-        "label": "Expertise Areas",
-        "score_key": "ExpertiseScore",
-        "project_key": "Integration Requirements (Expertise Areas)",      # Expected: list of strings
-        "employee_key": "Expertise Areas",    # Expected: list of strings
-        "render_function_name": "render_list_comparison",
-        "item_name_singular": "Expertise Area",
-        "item_name_plural": "Expertise Areas"
-    },
-    # {
-    #     "label": "Years of Experience",
-    #     "score_key": "YearsExperienceScore",
-    #     "project_key": "RequiredExperienceYears", # Expected: int or float
-    #     "employee_key": "Years of Experience",   # Expected: int or float
-    #     "render_function_name": "render_numerical_comparison",
-    #     "unit": "years"
-    # },
-    {
-        "label": "Location",
-        "score_key": "LocationScore", # This score might be 0 if location is a hard filter
-        "project_key": "Work Location",    # Expected: string
-        "employee_key": "Work Location",   # Expected: string
-        "render_function_name": "render_string_comparison"
-    },
-    {
-        "label": "Work Modality",
-        "score_key": None, # May not have a direct score component if it's about compatibility
-        "project_key": "Work Flexibility", 
-        "employee_key": "Work Flexibility",
-        "render_function_name": "render_work_modality_comparison"
-    },
+# --- Placeholder Helper Functions for Attribute Comparison ---
+@st.cache_data # The same project's requirements are prepared once, not once per rendered candidate
+def _prep_skills(raw_skill_items):
+    """(lower-cased skill -> original name, lower-cased skill -> level) for a tuple of (skill, level) items."""
+    return _skill_maps(raw_skill_items)
+
+def _skill_maps(skill_items):
+    """Both lookup maps of _prep_skills, built from one (original, lower-cased, level) pass over the string-keyed items."""
+    skill_entries = [(k, k.lower().strip(), v) for k, v in skill_items if isinstance(k, str)]
+    skills_map_lower_to_orig = {k_lower: k for k, k_lower, _ in skill_entries}
+    skills_lower = {k_lower: v for _, k_lower, v in skill_entries}
+    return skills_map_lower_to_orig, skills_lower
+
+@st.cache_data
+def _prep_list_items(raw_items):
+    """Stripped non-empty items as strings, for a tuple of raw list items."""
+    return [str(item).strip() for item in raw_items if item is not None and str(item).strip()]
+
+@st.cache_data(max_entries=256) # Reruns and repeated renders of the same project/employee pair skip the fuzzy matching (bounded like the radar figures)
+def _compute_list_comparison(project_items, employee_items, threshold, project_col_name, employee_col_name, status_col_name):
+    """
+    Comparison table columns ({column name: values}) for tuples of prepared project/employee items (see _prep_list_items):
+    each project item with its best fuzzy match (fuzz.ratio >= threshold) among the not yet matched employee items, then
+    the unmatched employee items. Built column-wise so the DataFrame needs no per-row dict inference.
+    """
+    project_items_lower_list = [item.lower() for item in project_items]
+    employee_items_lower_list = [item.lower() for item in employee_items]
+
+    # Greedy pairing in project order: each project item takes its first best not yet matched employee item, if that
+    # scores >= threshold. A matched employee item's column is masked with -1 so it isn't matched twice; as masking only
+    # lowers scores, the rows without any score >= threshold up front are ruled out in one vectorized pass.
+    matched_employee_indices = np.full(len(project_items), -1)
+    employee_item_matched = np.zeros(len(employee_items), dtype=bool)
+    if project_items and employee_items:
+        # fuzz.ratio is dispatched to rapidfuzz's bit-parallel Indel kernel; score_cutoff lets it give up early on
+        # pairs that can't round up to the threshold (returned as 0, which can't be picked anyway). Scores are rounded
+        # to ints as fuzzywuzzy did, so e.g. 84.6 still matches at 85 and near-ties go to the first item.
+        match_scores = np.rint(process.cdist(project_items_lower_list, employee_items_lower_list, scorer=fuzz.ratio, processor=None,
+                                             score_cutoff=threshold - 0.5, dtype=np.float64))
+        for p_idx in np.flatnonzero(match_scores.max(axis=1) >= threshold):
+            e_idx = int(match_scores[p_idx].argmax()) # First best, like the strict '>' scan over the items
+            if match_scores[p_idx, e_idx] >= threshold:
+                matched_employee_indices[p_idx] = e_idx
+                employee_item_matched[e_idx] = True
+                match_scores[:, e_idx] = -1 # Already matched this employee item
+
+    project_column = list(project_items)
+    employee_column = []
+    status_column = []
+    for p_idx, e_idx in enumerate(matched_employee_indices.tolist()):
+        if e_idx < 0:
+            employee_column.append("-")
+            status_column.append("❌ Missing")
+            continue
+        best_e_item_orig = employee_items[e_idx]
+        employee_column.append(best_e_item_orig)
+        if project_items_lower_list[p_idx] == employee_items_lower_list[e_idx]: # Check if it was a direct match after lowercasing
+            status_column.append("✔️ Matched")
+        else:
+            status_column.append(f"✔️ Matched (Fuzzy: {best_e_item_orig})")
 
-    {
-        "label": "Languages",
-        "score_key": "LanguageScore",
-        "project_key": "Languages Required",      # Expected: list of dicts, e.g., [{"Language": "English", "Proficiency": "Fluent"}]
-        "employee_key": "Languages Known",            # Expected: dict, e.g., {"English": "C1"}
-        "render_function_name": "render_languages_comparison"
-    },
-    {
-        "label": "Industry Vertical",
-        "score_key": "IndustryScore",
-        "project_key": "Customer Industry",  # Key in project_details
-        "employee_key": "Industry Experience", # Key in candidate_data
-        "render_function_name": "render_list_comparison",
-        "item_name_singular": "Industry",
-        "item_name_plural": "Industries"
-    }
-]
+    # Add any additional employee items not processed
+    additional_items = [e_item_orig for e_item_orig, matched in zip(employee_items, employee_item_matched.tolist()) if not matched]
+    project_column += ["-"] * len(additional_items)
+    employee_column += additional_items
+    status_column += ["✨ Additional"] * len(additional_items)
+    return {project_col_name: project_column, employee_col_name: employee_column, status_col_name: status_column}
 
-# --- Placeholder Helper Functions for Attribute Comparison ---
 def render_skills_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
     st.subheader(config_entry['label'])
 
     raw_project_skills = project_value if isinstance(project_value, dict) else {}
     raw_employee_skills = employee_value if isinstance(employee_value, dict) else {}
 
-    project_skills_orig_filtered = {k: v for k, v in raw_project_skills.items() if isinstance(k, str)}
-    employee_skills_orig_filtered = {k: v for k, v in raw_employee_skills.items() if isinstance(k, str)}
-
-    project_skills_map_lower_to_orig = {k.lower().strip(): k for k in project_skills_orig_filtered.keys()}
-    project_skills_lower = {k.lower().strip(): v for k, v in project_skills_orig_filtered.items()}
-
-    employee_skills_map_lower_to_orig = {k.lower().strip(): k for k in employee_skills_orig_filtered.keys()}
-    employee_skills_lower = {k.lower().strip(): v for k, v in employee_skills_orig_filtered.items()}
+    project_skills_map_lower_to_orig, project_skills_lower = _prep_skills(tuple(raw_project_skills.items()))
+    employee_skills_map_lower_to_orig, employee_skills_lower = _skill_maps(raw_employee_skills.items())
 
     comparison_data = []
     processed_employee_skills_lower = set()
@@ -238,24 +264,8 @@ def render_skills_comparison(project_value, employee_value, project_details, can
 
     df = pd.DataFrame(comparison_data)
 
-    def style_status(row):
-        style = ''
-        if row['Status'] == "✅ Exceeds":
-            style = 'background-color: #c8e6c9; color: #2e7d32;'
-        elif row['Status'] == "✔️ Meets":
-            style = 'background-color: #dcedc8; color: #388e3c;'
-        elif row['Status'] == "⚠️ Below":
-            style = 'background-color: #fff9c4; color: #f57f17;'
-        elif row['Status'] == "❌ Missing":
-            style = 'background-color: #ffcdd2; color: #c62828;'
-        elif row['Status'] == "✨ Additional":
-            style = 'background-color: #e3f2fd; color: #0d47a1;'
-        return [style] * len(row)
-
-    # Apply styling. Using st.dataframe which handles styling differently than pure pandas styling.
-    # For more complex styling, might need HTML table or investigate aggrid.
-    # For now, let's use st.dataframe and keep the summary separate.
-    st.dataframe(df.style.apply(style_status, axis=1), use_container_width=True, hide_index=True)
+    # Apply styling and emit the table as HTML; the summary stays separate.
+    _show_comparison_table(df, 'Status', SKILL_STATUS_STYLES)
 
     # Recalculate summary counts based on the DataFrame statuses
     summary_counts = df['Status'].value_counts().to_dict()
@@ -282,15 +292,13 @@ def render_list_comparison(project_value, employee_value, project_details, candi
     project_items_raw = project_value if isinstance(project_value, list) else ([] if project_value is None else [str(project_value)])
     employee_items_raw = employee_value if isinstance(employee_value, list) else ([] if employee_value is None else [str(employee_value)])
 
-    project_items_orig_list = [str(item).strip() for item in project_items_raw if item is not None and str(item).strip()]
+    project_items_orig_list = _prep_list_items(tuple(project_items_raw))
     employee_items_orig_list = [str(item).strip() for item in employee_items_raw if item is not None and str(item).strip()]
 
     # For fuzzy matching, it's better to have a list of originals to iterate and match against
     # project_items_lower_map = {item.lower(): item for item in project_items_orig_list}
     # employee_items_lower_map = {item.lower(): item for item in employee_items_orig_list}
 
-    comparison_data = []
-    processed_employee_indices = set()
     project_col_name = f"Project {config_entry.get('item_name_singular', 'Requirement')}" # Changed 'Item' to 'Requirement' for clarity
     employee_col_name = f"Employee {config_entry.get('item_name_singular', 'Experience')}" # Changed 'Has' to 'Experience'
     status_col_name = "Status"
@@ -301,50 +309,12 @@ def render_list_comparison(project_value, employee_value, project_details, candi
         st.markdown("---")
         return
 
-    for p_idx, p_item_orig in enumerate(project_items_orig_list):
-        p_item_lower = p_item_orig.lower()
-        best_match_score = 0
-        best_e_match_idx = -1
-        best_e_item_orig = "-" # Default if no match
-
-        for e_idx, e_item_orig in enumerate(employee_items_orig_list):
-            if e_idx in processed_employee_indices:
-                continue # Already matched this employee item
-            
-            e_item_lower = e_item_orig.lower()
-            current_match_score = fuzz.ratio(p_item_lower, e_item_lower)
-            
-            if current_match_score > best_match_score:
-                best_match_score = current_match_score
-                best_e_match_idx = e_idx
-                best_e_item_orig = e_item_orig
-        
-        row = {
-            project_col_name: p_item_orig,
-            employee_col_name: "-",
-            status_col_name: "❌ Missing"
-        }
-
-        if best_match_score >= fuzzy_match_threshold:
-            row[employee_col_name] = best_e_item_orig
-            processed_employee_indices.add(best_e_match_idx)
-            if p_item_lower == best_e_item_orig.lower(): # Check if it was a direct match after lowercasing
-                row[status_col_name] = "✔️ Matched"
-            else:
-                row[status_col_name] = f"✔️ Matched (Fuzzy: {best_e_item_orig})"
-        comparison_data.append(row)
-
-    # Add any additional employee items not processed
-    for e_idx, e_item_orig in enumerate(employee_items_orig_list):
-        if e_idx not in processed_employee_indices:
-            row = {
-                project_col_name: "-",
-                employee_col_name: e_item_orig,
-                status_col_name: "✨ Additional"
-            }
-            comparison_data.append(row)
+    comparison_columns = _compute_list_comparison(
+        tuple(project_items_orig_list), tuple(employee_items_orig_list), fuzzy_match_threshold,
+        project_col_name, employee_col_name, status_col_name
+    )
     
-    if not comparison_data:
+    if not comparison_columns[status_col_name]:
         # This block might be reached if only one side has items and no matches/additional are generated
         # The initial check for both empty handles one case. This handles others.
         if project_items_orig_list and not employee_items_orig_list:
@@ -356,125 +326,42 @@ def render_list_comparison(project_value, employee_value, project_details, candi
         st.markdown("---")
         return
 
-    df = pd.DataFrame(comparison_data)
-    df_columns = [project_col_name, employee_col_name, status_col_name]
-    df = df[df_columns] # Ensure column order and presence
-
-    def style_status_list(row):
-        style = [''] * len(row)
-        status_val = row.get(status_col_name, '')
-        if status_val.startswith("✔️ Matched"):
-            style = ['background-color: #dcedc8; color: #388e3c;'] * len(row)
-        elif status_val == "❌ Missing":
-            style = ['background-color: #ffcdd2; color: #c62828;'] * len(row)
-        elif status_val == "✨ Additional":
-            style = ['background-color: #e3f2fd; color: #0d47a1;'] * len(row)
-        return style
+    df = pd.DataFrame(comparison_columns) # Columns in project / employee / status order
 
     if not df.empty:
-        st.dataframe(df.style.apply(style_status_list, axis=1), use_container_width=True, hide_index=True)
+        _show_comparison_table(df, status_col_name, LIST_STATUS_STYLES)
     else:
         st.caption(f"No relevant {label.lower()} data to display after comparison.")
 
     st.markdown("---")
 
 
-def render_industry_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
-    label = config_entry.get('label', 'Industry Vertical')
-    st.markdown(f"<h5 style='margin-bottom: 0.1rem;'>{label}</h5>", unsafe_allow_html=True)
-
-    project_industry = project_value # Directly use passed project_value
-    employee_industries = employee_value # Directly use passed employee_value
-
-    # Ensure employee_industries is a list, even if it's a single string from JSON/data
-    if isinstance(employee_industries, str):
-        # Basic assumption: if it's a string, treat it as a single industry unless it's clearly JSON
+def _try_convert_to_float(val):
+    if val is None:
+        return None
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        val_stripped = val.strip()
+        if not val_stripped:
+            return None
         try:
-            if employee_industries.startswith('[') and employee_industries.endswith(']'):
-                parsed_industries = json.loads(employee_industries)
-                if isinstance(parsed_industries, list):
-                    employee_industries = parsed_industries
-                else: # Not a list after parsing, treat original string as one item
-                    employee_industries = [employee_industries]
-            else: # Not a JSON list string, treat as single item
-                employee_industries = [employee_industries.strip()] 
-        except json.JSONDecodeError:
-            employee_industries = [employee_industries.strip()] # If JSON parse fails, treat as single
-    elif not isinstance(employee_industries, list):
-        employee_industries = [] # Default to empty list if not string or list
-    
-    # Filter out any None or empty strings from employee_industries after processing
-    employee_industries = [str(ei).strip() for ei in employee_industries if ei and str(ei).strip()]
-    project_industry_str = str(project_industry).strip() if project_industry and str(project_industry).strip() else None
-
-    match_found = False
-    matched_employee_industry = None
-
-    if project_industry_str and employee_industries:
-        for emp_ind in employee_industries:
-            if fuzzy_match(project_industry_str, emp_ind):
-                match_found = True
-                matched_employee_industry = emp_ind
-                break
-
-    # Determine display text and style
-    display_text = ""
-    status_color = "grey"
-
-    if not project_industry_str:
-        status_text = "ℹ️ Project industry not specified."
-        proj_display_str = "Not Specified"
-        emp_display_str = f"{', '.join(employee_industries)}" if employee_industries else "Not Specified"
-    elif not employee_industries:
-        status_text = f"⚠️ Employee has no listed industry experience. Project requires: {project_industry_str}."
-        status_color = "orange"
-        proj_display_str = project_industry_str
-        emp_display_str = "Not Specified"
-    elif match_found:
-        status_text = f"✅ Match Found (Project: '{project_industry_str}', Employee: '{matched_employee_industry}')."
-        status_color = "green"
-        proj_display_str = project_industry_str
-        emp_display_str = f"{', '.join(employee_industries)} (Matched: {matched_employee_industry})"
-        # Consider listing only the matched and then 'others' if list is long
-    else: # No match found, project and employee industries are specified
-        status_text = f"ℹ️ No direct match. Project: '{project_industry_str}'. Employee: '{', '.join(employee_industries)}'."
-        status_color = "#808080" # Darker grey or orange for noticeable difference
-        proj_display_str = project_industry_str
-        emp_display_str = f"{', '.join(employee_industries)}"
-
-    st.markdown(f"**Project Requirement:** {proj_display_str}")
-    st.markdown(f"**Employee Experience:** {emp_display_str}")
-    if status_text:
-        st.markdown(f"**Status:** <span style='color: {status_color};'>{status_text}</span>", unsafe_allow_html=True)
-
-    st.markdown("---")
+            return float(val_stripped)
+        except ValueError:
+            cleaned_val = _NUM_CLEAN_RE.sub("", val_stripped)
+            if cleaned_val and cleaned_val != ".":
+                try:
+                    return float(cleaned_val)
+                except ValueError:
+                    return None
+            return None
+    return None
 
 def render_numerical_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
     label = config_entry.get('label', 'Numerical Value')
     unit = config_entry.get('unit', '')
     st.subheader(label)
 
-    def _try_convert_to_float(val):
-        if val is None:
-            return None
-        if isinstance(val, (int, float)):
-            return float(val)
-        if isinstance(val, str):
-            val_stripped = val.strip()
-            if not val_stripped:
-                return None
-            try:
-                return float(val_stripped)
-            except ValueError:
-                cleaned_val = re.sub(r"[^\d\.]", "", val_stripped)
-                if cleaned_val and cleaned_val != ".":
-                    try:
-                        return float(cleaned_val)
-                    except ValueError:
-                        return None
-                return None
-        return None
-
     proj_val_num = _try_convert_to_float(project_value)
     emp_val_num = _try_convert_to_float(employee_value)
 
@@ -507,22 +394,7 @@ def render_numerical_comparison(project_value, employee_value, project_details,
 
     df = pd.DataFrame(comparison_table_data)
 
-    def style_numerical_status(row):
-        style = [''] * len(row)
-        status_val = row.get('Status', '')
-        if "✅ Exceeds" in status_val:
-            style = ['background-color: #c8e6c9; color: #2e7d32;'] * len(row)
-        elif "✔️ Meets" in status_val:
-            style = ['background-color: #dcedc8; color: #388e3c;'] * len(row)
-        elif "⚠️ Below" in status_val:
-            style = ['background-color: #fff9c4; color: #f57f17;'] * len(row)
-        elif "❓ Employee Data Missing/Invalid" in status_val:
-            style = ['background-color: #f5f5f5; color: #757575;'] * len(row) # Light grey for missing data
-        elif "ℹ️" in status_val: # Catches "Not Specified" and "Data Not Available"
-            style = ['background-color: #e3f2fd; color: #0d47a1;'] * len(row) # Blue for info
-        return style
-
-    st.dataframe(df.style.apply(style_numerical_status, axis=1), use_container_width=True, hide_index=True)
+    _show_comparison_table(df, 'Status', NUMERICAL_STATUS_STYLES)
     st.markdown("---")
 
 def render_string_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
@@ -557,20 +429,7 @@ def render_string_comparison(project_value, employee_value, project_details, can
 
     df = pd.DataFrame(comparison_table_data)
 
-    def style_string_status(row):
-        style = [''] * len(row)
-        status_val = row.get('Status', '')
-        if "✔️ Matched" in status_val:
-            style = ['background-color: #dcedc8; color: #388e3c;'] * len(row)
-        elif "⚠️ Mismatched" in status_val:
-            style = ['background-color: #fff9c4; color: #f57f17;'] * len(row)
-        elif "❓ Employee Data Missing/Not Specified" in status_val:
-            style = ['background-color: #f5f5f5; color: #757575;'] * len(row)
-        elif "ℹ️" in status_val: # Catches "Project Requirement Not Specified" and "Data Not Available"
-            style = ['background-color: #e3f2fd; color: #0d47a1;'] * len(row)
-        return style
-
-    st.dataframe(df.style.apply(style_string_status, axis=1), use_container_width=True, hide_index=True)
+    _show_comparison_table(df, 'Status', STRING_STATUS_STYLES)
     st.markdown("---")
 
 def render_work_modality_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
@@ -617,24 +476,13 @@ def render_work_modality_comparison(project_value, employee_value, project_detai
 
     df = pd.DataFrame(comparison_table_data)
 
-    def style_modality_status(row):
-        style = [''] * len(row)
-        status_val = row.get('Compatibility', '')
-        if "✅ Compatible" in status_val:
-            style = ['background-color: #dcedc8; color: #388e3c;'] * len(row) # Green
-        elif "⚠️ Potentially Compatible" in status_val: # Catches both 'Discuss' and 'Employee Flexible'
-            style = ['background-color: #fff9c4; color: #f57f17;'] * len(row) # Yellow/Orange
-        elif "❌ Mismatch" in status_val:
-            style = ['background-color: #ffcdd2; color: #c62828;'] * len(row) # Red
-        elif "❓ Employee Preference Not Specified" in status_val:
-            style = ['background-color: #f5f5f5; color: #757575;'] * len(row) # Grey for missing preference
-        elif "ℹ️" in status_val: # Catches "Project Requirement Not Specified" and "Data Not Available"
-            style = ['background-color: #e3f2fd; color: #0d47a1;'] * len(row) # Blue for info
-        return style
-
-    st.dataframe(df.style.apply(style_modality_status, axis=1), use_container_width=True, hide_index=True)
+    _show_comparison_table(df, 'Compatibility', MODALITY_STATUS_STYLES)
     st.markdown("---")
 
+def _fmt_num(x, prec=1):
+    """Floats to `prec` decimals; anything else (ints, "N/A") via str()."""
+    return format(x, f'.{prec}f') if isinstance(x, float) else str(x)
+
 def format_date_for_display(date_obj):
     if date_obj and isinstance(date_obj, dt_datetime):
         return date_obj.strftime('%Y-%m-%d')
@@ -642,10 +490,46 @@ def format_date_for_display(date_obj):
         return date_obj
     return "N/A"
 
-def render_availability_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
+_AVAILABILITY_DATE_KEYS = ("parsed_project_end_date", "parsed_employee_available_date", "calculated_project_end_for_employee")
+
+def prepare_candidates_for_display(scored_candidates):
+    """
+    Normalizes the scored candidates once after scoring: every candidate gets a 'Details' dict (empty if missing),
+    the availability dates ('_dates'), the title badges ('_badges') and the Detailed Scores tab values ('_fmt') are
+    formatted up front so re-expanding a candidate does not re-run strftime. They sit next to Details, not inside it,
+    so the Raw Data tab shows only what the scorer returned.
+    """
+    for score_info in scored_candidates:
+        details = score_info.setdefault('Details', {})
+        individual_scores = score_info.get('Scores', {})
+        score_info['_badges'] = (
+            get_score_badge_html(score_info.get('OverallWeightedScore', 0), "Overall", "🎯"),
+            get_score_badge_html(individual_scores.get('AvailabilityScore', 0.0), "Avail.", "⏱️"),
+        )
+        formatted_scores = {}
+        for score_key, *_ in _SCORE_META:
+            raw_score_value = individual_scores.get(score_key, 0.0)
+            # Special handling for RetrieverScore if its primary key isn't found
+            if score_key == "RetrieverScore" and score_key not in individual_scores:
+                raw_score_value = individual_scores.get('document_score', 0.0)
+            formatted_scores[score_key] = f"{float(raw_score_value):.2f}"
+        score_info['_fmt'] = formatted_scores
+        availability_details = details.get('AvailabilityScore')
+        if isinstance(availability_details, dict):
+            score_info['_dates'] = {date_key: format_date_for_display(availability_details.get(date_key)) for date_key in _AVAILABILITY_DATE_KEYS}
+    return scored_candidates
+
+def _display_date(details, date_key, display_dates=None):
+    # Preformatted string when given (score_info['_dates'], see prepare_candidates_for_display), formatted on the spot otherwise
+    if display_dates and date_key in display_dates:
+        return display_dates[date_key]
+    return format_date_for_display(details.get(date_key))
+
+def render_availability_comparison(project_value, employee_value, project_details, candidate_data, config_entry, display_dates=None):
     """
     Renders the availability comparison using the structured dictionary from availability_score.
-    'employee_value' is expected to be the dictionary from scores['Details']['AvailabilityScore'].
+    'employee_value' is expected to be the dictionary from scores['Details']['AvailabilityScore'];
+    'display_dates' optionally holds its dates already formatted (score_info['_dates']).
     """
     
     label = config_entry.get('label', "Timeline & Availability Assessment") # Use label from config, fallback if needed
@@ -660,11 +544,11 @@ def render_availability_comparison(project_value, employee_value, project_detail
     # Extract data from the employee_value (which is the details_dict)
     proj_effort_hours = employee_value.get("raw_project_effort_hours", "N/A")
     proj_effort_calculated_days = employee_value.get("project_effort_calculated_days", "N/A")
-    parsed_proj_end_date = employee_value.get("parsed_project_end_date")
+    parsed_proj_end_date = _display_date(employee_value, "parsed_project_end_date", display_dates)
     
-    parsed_emp_avail_date = employee_value.get("parsed_employee_available_date")
+    parsed_emp_avail_date = _display_date(employee_value, "parsed_employee_available_date", display_dates)
     emp_weekly_capacity_hours = employee_value.get("employee_weekly_capacity_hours", "N/A")
-    calculated_emp_end_date = employee_value.get("calculated_project_end_for_employee")
+    calculated_emp_end_date = _display_date(employee_value, "calculated_project_end_for_employee", display_dates)
     
     days_over_under = employee_value.get("days_over_under", 0) # positive if over, negative if under/on_time
     status_message = employee_value.get("status_message", "Details not available.")
@@ -674,24 +558,21 @@ def render_availability_comparison(project_value, employee_value, project_detail
     st.markdown("##### Project Requirements")
     col1_proj, col2_proj, col3_proj = st.columns(3)
     with col1_proj:
-        value_display_hours = f"{proj_effort_hours:.1f}" if isinstance(proj_effort_hours, float) else str(proj_effort_hours)
-        st.metric(label="Required Effort (Person-Hours)", value=value_display_hours)
+        st.metric(label="Required Effort (Person-Hours)", value=_fmt_num(proj_effort_hours))
     with col2_proj:
-        value_display_days = f"{proj_effort_calculated_days:.1f}" if isinstance(proj_effort_calculated_days, float) else str(proj_effort_calculated_days)
-        st.metric(label="Equivalent (Person-Days)", value=value_display_days)
+        st.metric(label="Equivalent (Person-Days)", value=_fmt_num(proj_effort_calculated_days))
     with col3_proj:
-        st.metric(label="Requested Project Deadline", value=format_date_for_display(parsed_proj_end_date))
+        st.metric(label="Requested Project Deadline", value=parsed_proj_end_date)
 
     # --- Display Employee Availability & Projection ---
     st.markdown("##### Employee Availability & Projection")
     col1_emp, col2_emp, col3_emp = st.columns(3)
     with col1_emp:
-        st.metric(label="Available From", value=format_date_for_display(parsed_emp_avail_date))
+        st.metric(label="Available From", value=parsed_emp_avail_date)
     with col2_emp:
-        value_display_cap = f"{emp_weekly_capacity_hours:.1f}" if isinstance(emp_weekly_capacity_hours, float) else str(emp_weekly_capacity_hours)
-        st.metric(label="Weekly Capacity (Hours)", value=value_display_cap)
+        st.metric(label="Weekly Capacity (Hours)", value=_fmt_num(emp_weekly_capacity_hours))
     with col3_emp:
-        st.metric(label="Est. Completion by Employee", value=format_date_for_display(calculated_emp_end_date))
+        st.metric(label="Est. Completion by Employee", value=calculated_emp_end_date)
         
     # --- Assessment ---
     st.markdown("##### Assessment Summary")
@@ -720,6 +601,19 @@ def render_availability_comparison(project_value, employee_value, project_detail
     st.markdown("---") # Adds a horizontal line for separation
 
 
+PROFICIENCY_ORDER = {"native": 7, "c2": 6, "c1": 5, "b2": 4, "b1": 3, "a2": 2, "a1": 1, "": 0, "not specified": 0}
+# PROFICIENCY_DISPLAY_MAP = {v: k.upper() for k, v in PROFICIENCY_ORDER.items()} # Not directly used for display in table, levels are uppercased manually
+_PROFICIENCY_GET = PROFICIENCY_ORDER.get
+
+def _parse_languages(raw_langs):
+    """Lower-cased, stripped language -> (original name, lower-cased level, level value) for the string pairs of raw_langs."""
+    langs_parsed = {}
+    for k, v in raw_langs.items():
+        if isinstance(k, str) and isinstance(v, str):
+            level_str = v.lower()
+            langs_parsed[k.lower().strip()] = (k, level_str, _PROFICIENCY_GET(level_str, 0))
+    return langs_parsed
+
 def render_languages_comparison(project_value, employee_value, project_details, candidate_data, config_entry):
     label = config_entry.get('label', 'Languages')
     st.subheader(label)
@@ -727,16 +621,15 @@ def render_languages_comparison(project_value, employee_value, project_details,
     raw_project_langs = project_value if isinstance(project_value, dict) else {}
     raw_employee_langs = employee_value if isinstance(employee_value, dict) else {}
 
-    PROFICIENCY_ORDER = {"native": 7, "c2": 6, "c1": 5, "b2": 4, "b1": 3, "a2": 2, "a1": 1, "": 0, "not specified": 0}
-    # PROFICIENCY_DISPLAY_MAP = {v: k.upper() for k, v in PROFICIENCY_ORDER.items()} # Not directly used for display in table, levels are uppercased manually
-
-    project_langs_parsed = {str(k).lower().strip(): {"original": str(k), "level_str": str(v).lower(), "level_val": PROFICIENCY_ORDER.get(str(v).lower(), 0)} 
-                               for k, v in raw_project_langs.items() if isinstance(k, str) and isinstance(v, str)}
+    project_langs_parsed = _parse_languages(raw_project_langs)
+    employee_langs_parsed = _parse_languages(raw_employee_langs)
 
-    employee_langs_parsed = {str(k).lower().strip(): {"original": str(k), "level_str": str(v).lower(), "level_val": PROFICIENCY_ORDER.get(str(v).lower(), 0)} 
-                                for k, v in raw_employee_langs.items() if isinstance(k, str) and isinstance(v, str)}
-
-    comparison_data = []
+    # Table columns, filled row by row in the loops below
+    project_languages = []
+    required_levels = []
+    employee_languages = []
+    employee_levels = []
+    statuses = []
     processed_employee_langs = set()
 
     # Handle empty cases early
@@ -750,74 +643,66 @@ def render_languages_comparison(project_value, employee_value, project_details,
         st.caption("No languages listed for this employee.")
     
     # Process project requirements
-    for p_lang_lower, p_data in project_langs_parsed.items():
-        p_level_display = p_data["level_str"].upper() if p_data["level_str"] else "N/A"
-        row = {
-            "Project Language": p_data["original"],
-            "Required Level": p_level_display,
-            "Employee Language": "N/A",
-            "Employee Level": "N/A",
-            "Status": "❌ Language Missing"
-        }
-        best_match_score = 0
+    employee_lang_keys = list(employee_langs_parsed)
+    for p_lang_lower, (p_lang_orig, p_level_str, p_level_val) in project_langs_parsed.items():
+        p_level_display = p_level_str.upper() if p_level_str else "N/A"
+        project_languages.append(p_lang_orig)
+        required_levels.append(p_level_display)
         matched_e_lang_lower = None
         matched_e_data = None
 
-        for e_lang_lower, e_data_loop_var in employee_langs_parsed.items():
-            current_match_score = fuzz.token_sort_ratio(p_lang_lower, e_lang_lower)
-            if current_match_score > best_match_score and current_match_score >= 80: 
-                best_match_score = current_match_score
-                matched_e_lang_lower = e_lang_lower
-                matched_e_data = e_data_loop_var
+        if p_lang_lower in employee_langs_parsed:
+            # Exact hit after lower-casing/stripping (the usual case): no fuzzy scoring needed
+            matched_e_lang_lower = p_lang_lower
+            matched_e_data = employee_langs_parsed[p_lang_lower]
+        elif employee_lang_keys:
+            # Best employee language scoring >= 80 (the first one on ties), scored in one call. Scores are rounded to
+            # ints first, as fuzzywuzzy's were, so e.g. 79.7 still matches and near-ties go to the first language.
+            lang_scores = np.rint(process.cdist([p_lang_lower], employee_lang_keys, scorer=fuzz.token_sort_ratio,
+                                                processor=utils.default_process, score_cutoff=79.5)[0])
+            best_idx = int(lang_scores.argmax())
+            if lang_scores[best_idx] >= 80:
+                matched_e_lang_lower = employee_lang_keys[best_idx]
+                matched_e_data = employee_langs_parsed[matched_e_lang_lower]
         
         if matched_e_data:
-            row["Employee Language"] = matched_e_data["original"]
-            e_level_display = matched_e_data["level_str"].upper() if matched_e_data["level_str"] else "N/A"
-            row["Employee Level"] = e_level_display
+            employee_languages.append(matched_e_data[0])
+            e_level_display = matched_e_data[1].upper() if matched_e_data[1] else "N/A"
+            employee_levels.append(e_level_display)
             processed_employee_langs.add(matched_e_lang_lower)
             
             # Determine status based on proficiency levels
-            if matched_e_data["level_val"] == 0 and p_data["level_val"] > 0 : # Employee level not specified, project requires one
-                 row["Status"] = "❓ Proficiency Unspecified"
-            elif matched_e_data["level_val"] >= p_data["level_val"]:
-                row["Status"] = "✔️ Meets/Exceeds"
+            if matched_e_data[2] == 0 and p_level_val > 0 : # Employee level not specified, project requires one
+                 statuses.append("❓ Proficiency Unspecified")
+            elif matched_e_data[2] >= p_level_val:
+                statuses.append("✔️ Meets/Exceeds")
             else:
-                row["Status"] = "⚠️ Below Proficiency"
-        comparison_data.append(row)
+                statuses.append("⚠️ Below Proficiency")
+        else:
+            employee_languages.append("N/A")
+            employee_levels.append("N/A")
+            statuses.append("❌ Language Missing")
 
     # Add any additional languages employee has that weren't matched to project requirements
-    for e_lang_lower, e_data in employee_langs_parsed.items():
+    for e_lang_lower, (e_lang_orig, e_level_str, _) in employee_langs_parsed.items():
         if e_lang_lower not in processed_employee_langs:
-            e_level_display = e_data["level_str"].upper() if e_data["level_str"] else "N/A"
-            row = {
-                "Project Language": "N/A",
-                "Required Level": "N/A",
-                "Employee Language": e_data["original"],
-                "Employee Level": e_level_display,
-                "Status": "✨ Additional Language"
-            }
-            comparison_data.append(row)
-
-    if comparison_data:
-        df = pd.DataFrame(comparison_data)
-        df = df[["Project Language", "Required Level", "Employee Language", "Employee Level", "Status"]]
+            e_level_display = e_level_str.upper() if e_level_str else "N/A"
+            project_languages.append("N/A")
+            required_levels.append("N/A")
+            employee_languages.append(e_lang_orig)
+            employee_levels.append(e_level_display)
+            statuses.append("✨ Additional Language")
+
+    if statuses:
+        df = pd.DataFrame({
+            "Project Language": project_languages,
+            "Required Level": required_levels,
+            "Employee Language": employee_languages,
+            "Employee Level": employee_levels,
+            "Status": statuses
+        })
         
-        def style_language_status(row):
-            status = row.get('Status', '')
-            style = [''] * len(row)
-            if "✔️ Meets/Exceeds" in status:
-                style = ['background-color: #dcedc8; color: #388e3c;'] * len(row)  # Green
-            elif "⚠️ Below Proficiency" in status:
-                style = ['background-color: #fff9c4; color: #f57f17;'] * len(row)  # Yellow/Orange
-            elif "❌ Language Missing" in status:
-                style = ['background-color: #ffcdd2; color: #c62828;'] * len(row)  # Red
-            elif "✨ Additional Language" in status:
-                style = ['background-color: #e3f2fd; color: #0d47a1;'] * len(row)  # Blue for info
-            elif "❓ Proficiency Unspecified" in status:
-                style = ['background-color: #f5f5f5; color: #757575;'] * len(row) # Grey for unspecified
-            return style
-
-        st.dataframe(df.style.apply(style_language_status, axis=1), use_container_width=True, hide_index=True)
+        _show_comparison_table(df, 'Status', LANGUAGE_STATUS_STYLES)
         st.markdown("---") # End of the main comparison block
     elif project_langs_parsed and not employee_langs_parsed:
         # This case handles when there are project requirements but no employee languages listed (after initial captions)
@@ -837,6 +722,132 @@ def render_languages_comparison(project_value, employee_value, project_details,
     # it seems the goal is to have a separator after the table OR after the st.info.
     # The very last st.markdown("---") from line 797 in view_line_range will be kept as the section ender.
 
+# --- Attribute Comparison Configuration ---
+# Defined after the render functions so each entry can reference its renderer directly
+ATTRIBUTE_COMPARISON_CONFIG = [
+    {
+        "label": "Skills",
+        "score_key": "SkillMatchScore",
+        "project_key": "Required Skills and Expertise",      # Expected in project_details: dict, e.g., {"Python": 4}
+        "employee_key": "Core Competencies", # Expected in candidate_data: dict, e.g., {"Python": 5}
+        "render_function": render_skills_comparison,
+    },
+    {
+        "label": "Products Experience",
+        "score_key": "ProductScore",
+        "project_key": "Products Involved",         # Expected: list of strings
+        "employee_key": "Products Experience",    # Expected: list of strings
+        "render_function": render_list_comparison,
+        "item_name_singular": "Product",
+        "item_name_plural": "Products"
+    },
+    {
+        "label": "Certifications",
+        "score_key": "CertificationScore",
+        "project_key": "Customer Preferences (Certifications)",             # Expected: list of strings
+        "employee_key": "External/Internal Certifications", # Expected: list of strings
+        "render_function": render_list_comparison,
+        "item_name_singular": "Certification",
+        "item_name_plural": "Certifications"
+    },
+
+    {
+        "label": "Availability & FTE",
+        "score_key": "AvailabilityScore", # Assumes scorer.py provides this
+        "render_function": render_availability_comparison,
+        # These keys tell the render function what fields to look for in project_details and candidate_data
+        "detail_keys": {
+            "project_start": "Project Start Date", # Ensure this key is correct for your project data if applicable
+            "project_end": "Requested End",      # Mapped to project's 'Requested End' (timestamp)
+            "project_fte": "Effort",             # Mapped to project's 'Effort' (e.g., total hours)
+            "employee_from": "Available from", # e.g., "YYYY-MM-DD" or timestamp
+            "employee_until": "Available until",  # e.g., "YYYY-MM-DD", timestamp, or "Open"
+            "employee_fte_current": "Current FTE %" # e.g., "20%" or 20
+        }
+    },
+    {
+        "label": "Expertise Areas",
+        "score_key": "ExpertiseScore",
+        "project_key": "Integration Requirements (Expertise Areas)",      # Expected: list of strings
+        "employee_key": "Expertise Areas",    # Expected: list of strings
+        "render_function": render_list_comparison,
+        "item_name_singular": "Expertise Area",
+        "item_name_plural": "Expertise Areas"
+    },
+    # {
+    #     "label": "Years of Experience",
+    #     "score_key": "YearsExperienceScore",
+    #     "project_key": "RequiredExperienceYears", # Expected: int or float
+    #     "employee_key": "Years of Experience",   # Expected: int or float
+    #     "render_function": render_numerical_comparison,
+    #     "unit": "years"
+    # },
+    {
+        "label": "Location",
+        "score_key": "LocationScore", # This score might be 0 if location is a hard filter
+        "project_key": "Work Location",    # Expected: string
+        "employee_key": "Work Location",   # Expected: string
+        "render_function": render_string_comparison
+    },
+    {
+        "label": "Work Modality",
+        "score_key": None, # May not have a direct score component if it's about compatibility
+        "project_key": "Work Flexibility", 
+        "employee_key": "Work Flexibility",
+        "render_function": render_work_modality_comparison
+    },
+
+    {
+        "label": "Languages",
+        "score_key": "LanguageScore",
+        "project_key": "Languages Required",      # Expected: list of dicts, e.g., [{"Language": "English", "Proficiency": "Fluent"}]
+        "employee_key": "Languages Known",            # Expected: dict, e.g., {"English": "C1"}
+        "render_function": render_languages_comparison
+    },
+    {
+        "label": "Industry Vertical",
+        "score_key": "IndustryScore",
+        "project_key": "Customer Industry",  # Key in project_details
+        "employee_key": "Industry Experience", # Key in candidate_data
+        "render_function": render_list_comparison,
+        "item_name_singular": "Industry",
+        "item_name_plural": "Industries"
+    }
+]
+
+def render_all_comparisons(project_details, candidate_data, emp_score_info):
+    """Renders every ATTRIBUTE_COMPARISON_CONFIG section (header, static table, summary) for one candidate."""
+    for config_entry in ATTRIBUTE_COMPARISON_CONFIG:
+        label = config_entry["label"]
+        render_function = config_entry.get("render_function")
+        if render_function:
+            project_value = None
+            employee_value = None
+            project_data_key = config_entry.get("project_key")
+            if project_data_key:
+                project_value = project_details.get(project_data_key)
+            employee_data_key = config_entry.get("employee_key")
+            if employee_data_key:
+                employee_value = candidate_data.get(employee_data_key)
+            try:
+                extra_kwargs = {}
+                score_key = config_entry.get("score_key")
+                if score_key == "AvailabilityScore" and "Details" in emp_score_info and "AvailabilityScore" in emp_score_info["Details"]:
+                    employee_value = emp_score_info["Details"]["AvailabilityScore"]
+                    extra_kwargs["display_dates"] = emp_score_info.get('_dates') # Formatted once after scoring
+                render_function(
+                    project_value=project_value, 
+                    employee_value=employee_value,
+                    project_details=project_details, 
+                    candidate_data=candidate_data,
+                    config_entry=config_entry,
+                    **extra_kwargs
+                )
+            except Exception as e:
+                st.error(f"Error rendering '{label}': {e}")
+        else:
+            st.warning(f"No render function configured for '{label}'.")
+
 # --- UI Enhancements: Score Display Configuration ---
 SCORE_DISPLAY_NAMES = {
     "SkillMatchScore": "Skill Match",
@@ -854,6 +865,7 @@ SCORE_DISPLAY_NAMES = {
     "RetrieverScore": "Retriever Relevance (Semantic)",
     # "ProjectComplexityScore": "Project Complexity Alignment" # USER REQUEST: Remove
 }
+_RADAR_METRICS = _radar_metrics(SCORE_DISPLAY_NAMES, SCORING_WEIGHTS)
 
 SCORE_EXPLANATIONS = {
     "SkillMatchScore": "How well the employee's skills and proficiency levels match the project's skill requirements.",
@@ -871,12 +883,16 @@ SCORE_EXPLANATIONS = {
     "RetrieverScore": "Primary score for textual role fit. Based on semantic similarity (Chroma DB embeddings) between the project query and the employee's profile.",
     # "ProjectComplexityScore": "How well the employee's profile aligns with the project's complexity level (based on heuristics in the scoring logic)." # USER REQUEST: Remove
 }
+# (score key, display name, explanation, weight label) for the Detailed Scores tab, in display order
+_SCORE_META = tuple(
+    (score_key, display_name, SCORE_EXPLANATIONS.get(score_key, "No explanation available."), f"Weight: {SCORING_WEIGHTS.get(score_key, 0.0):.2f}")
+    for score_key, display_name in SCORE_DISPLAY_NAMES.items()
+)
 
 # Original line that was targeted for replacement was 'import streamlit as st',
 # so we assume the next original line of the file would typically follow here.
 # If 'import streamlit as st' was the very first line, this structure is correct.
 import pandas as pd
-import json
 import os
 import datetime
 from retriever import initialize_retriever_system # Assuming EmployeeRetriever is part of this
@@ -899,10 +915,16 @@ st.set_page_config(
 # This function will load your custom CSS file
 def local_css(file_name):
     try:
-        with open(file_name) as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        css = _read_css(file_name, os.path.getmtime(file_name))
     except FileNotFoundError:
         st.warning(f"Custom CSS file '{file_name}' not found. Using default styles.")
+        return
+    st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
+
+@st.cache_data # Read once per file version instead of on every rerun
+def _read_css(file_name, mtime):
+    with open(file_name) as f:
+        return f.read()
 
 # Attempt to load custom CSS - ensure 'assets/custom.css' path is correct
 css_file_path = os.path.join(os.path.dirname(__file__), 'assets', 'custom.css')
@@ -911,12 +933,16 @@ local_css(css_file_path)
 # --- Helper function for date formatting ---
 def format_timestamp_to_date(timestamp_ms):
     if isinstance(timestamp_ms, (int, float)):
-        try:
-            return datetime.datetime.fromtimestamp(timestamp_ms / 1000).strftime('%Y-%m-%d')
-        except (ValueError, TypeError):
-            return str(timestamp_ms) # Return as string if conversion fails
+        return _format_ms_timestamp(timestamp_ms)
     return str(timestamp_ms) # Return as string if not a number
 
+@functools.lru_cache(maxsize=4096) # Candidates often share availability dates; each distinct timestamp is formatted once
+def _format_ms_timestamp(timestamp_ms):
+    try:
+        return datetime.datetime.fromtimestamp(timestamp_ms / 1000).strftime('%Y-%m-%d')
+    except (ValueError, TypeError, OverflowError, OSError):
+        return str(timestamp_ms) # Return as string if conversion fails
+
 # --- Caching Data Loading and Initialization ---
 @st.cache_resource # Cache the retriever system for performance
 def load_retriever_system():
@@ -931,21 +957,145 @@ def load_retriever_system():
     print("Retriever system initialized.")
     return retriever
 
-@st.cache_data # Cache data loading
 def load_data(file_path):
     if not os.path.exists(file_path):
         st.error(f"Error: File not found at {file_path}")
         return None
+    # The modification time is part of the cache key, so an edited/regenerated file is reloaded automatically
+    return _load_json_file(file_path, os.path.getmtime(file_path))
+
+@st.cache_data(max_entries=2) # Cache data loading: the current version of the project and employee files
+def _load_json_file(file_path, mtime):
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
     except Exception as e:
         st.error(f"Error loading data from {file_path}: {e}")
         return None
 
+def load_employee_map(file_path):
+    """EmployeeID -> employee record for the employee file (built once per file version, not on every rerun)."""
+    return _build_employee_map(file_path, os.path.getmtime(file_path))
+
+@st.cache_resource(max_entries=1) # One shared, read-only map (records are copied before they are modified); no per-rerun copy
+def _build_employee_map(file_path, mtime):
+    employees = _load_json_file(file_path, mtime) or []
+    return {emp['EmployeeID']: emp for emp in employees}
+
+def employee_chips_html(employee):
+    """Chip HTML for an employee's Core Competencies, Products Experience and Certifications (using existing HTML chip style for now)."""
+    employee_skills = employee.get('Core Competencies')
+    if isinstance(employee_skills, dict) and employee_skills:
+        skills_html = "**Core Competencies:** " + ", ".join([f"<span class='chip skill'>{str(skill)} (Lvl: {str(level)})</span>" for skill, level in employee_skills.items()])
+    elif isinstance(employee_skills, list) and employee_skills:
+        skills_html = "**Core Competencies:** " + ", ".join([f"<span class='chip skill'>{str(skill)}</span>" for skill in employee_skills])
+    else:
+        skills_html = "**Core Competencies:** N/A"
+
+    employee_products = employee.get('Products Experience')
+    if employee_products and isinstance(employee_products, list):
+        products_html = "**Products Experience:** " + ", ".join([f"<span class='chip product'>{str(prod)}</span>" for prod in employee_products])
+    else:
+        products_html = "**Products Experience:** N/A"
+
+    employee_certs = employee.get('External/Internal Certifications')
+    if employee_certs and isinstance(employee_certs, list):
+        certs_html = "**Certifications:** " + ", ".join([f"<span class='chip'>{str(cert)}</span>" for cert in employee_certs])
+    else:
+        certs_html = "**Certifications:** N/A"
+    return {'skills_html': skills_html, 'products_html': products_html, 'certs_html': certs_html}
+
+def load_employee_chips(file_path):
+    """EmployeeID -> chip HTML (see employee_chips_html) for the employee file, built once per file version."""
+    return _build_employee_chips(file_path, os.path.getmtime(file_path))
+
+@st.cache_resource(max_entries=1) # Shared and read-only, like the employee map; one entry per current file version
+def _build_employee_chips(file_path, mtime):
+    return {emp_id: employee_chips_html(emp) for emp_id, emp in _build_employee_map(file_path, mtime).items()}
+
+def load_project_index(file_path):
+    """Display name -> project record for the project file (built once per file version, not on every rerun)."""
+    return _build_project_index(file_path, os.path.getmtime(file_path))
+
+@st.cache_resource(max_entries=1) # Shared and read-only, like the employee map; one entry per current file version
+def _build_project_index(file_path, mtime):
+    project_index = {}
+    for p in _load_json_file(file_path, mtime) or []:
+        # setdefault: on duplicate names the first project wins, as with the selectbox's first match
+        project_index.setdefault(p.get('ProjectName', f"Project ID: {p.get('ProjectID', 'Unknown')}"), p)
+    return project_index
+
 # --- Main Application Logic ---
 from PIL import Image # Add import for Image
 
+@st.cache_data # The selected project's chips are built once, not on every widget interaction
+def _chips_html(title, items_list_or_dict, is_dict_with_levels):
+    chip_html = f"**{title}:** "
+    if is_dict_with_levels and isinstance(items_list_or_dict, dict):
+        chip_html += ", ".join([f"<span class='chip skill'>{str(skill)} (Lvl: {str(level)})</span>" for skill, level in items_list_or_dict.items()])
+    elif isinstance(items_list_or_dict, list):
+        chip_html += ", ".join([f"<span class='chip product'>{str(item)}</span>" for item in items_list_or_dict])
+    elif isinstance(items_list_or_dict, dict): # Fallback for dicts not treated as skills with levels
+         chip_html += ", ".join([f"<span class='chip'>{str(key)}</span>" for key in items_list_or_dict.keys()])
+    else:
+        chip_html += "N/A"
+    return chip_html
+
+# Availability filter bucket -> vectorized membership test over an array of availability scores
+_AVAILABILITY_BUCKET_MASKS = {
+    "1.0": lambda scores: scores == 1.0,
+    "0.75": lambda scores: (scores > 0.5) & (scores < 1.0),
+    "0.25": lambda scores: (scores > 0.0) & (scores <= 0.5),
+    "0.0": lambda scores: scores == 0.0,
+}
+
+@st.cache_data(max_entries=64) # Reruns with the same results and selections (e.g. opening an expander) skip filtering/sorting
+def filter_and_sort_candidates(candidate_keys, filter_types, sort_option):
+    """
+    Display order, as positions into the scored candidates, for the given (OverallWeightedScore, AvailabilityScore)
+    pairs (NaN when no availability score), selected availability buckets and sort option.
+    """
+    positions = range(len(candidate_keys))
+    avail_scores = np.fromiter((avail for _, avail in candidate_keys), dtype=np.float64, count=len(candidate_keys))
+    if filter_types:
+        # One vectorized test per selected bucket over all candidates' availability scores (NaN matches no bucket)
+        matched_filter = np.zeros(len(candidate_keys), dtype=bool)
+        for filter_type in filter_types:
+            matched_filter |= _AVAILABILITY_BUCKET_MASKS[filter_type](avail_scores)
+        positions = np.flatnonzero(matched_filter).tolist()
+
+    # Sort keys are extracted into a flat list once and looked up by position (no per-comparison lambda)
+    if sort_option == "Availability (Highest First)":
+        sort_keys = np.nan_to_num(avail_scores, nan=0.0).tolist() # A missing availability score sorts as 0
+        return sorted(positions, key=sort_keys.__getitem__, reverse=True)
+    if filter_types:
+        # Filtering keeps the relative order; re-sorted explicitly by overall score as before
+        sort_keys = [overall for overall, _ in candidate_keys]
+        return sorted(positions, key=sort_keys.__getitem__, reverse=True)
+    # Else, it remains sorted by OverallWeightedScore (its original state)
+    return list(positions)
+
+@st.fragment # Moving a slider reruns only this panel, not the whole page (weights are only read when "Find" is clicked)
+def _weights_panel():
+    with st.expander("⚙️ Adjust Scoring Weights", expanded=False):
+        for weight_key, weight_value in st.session_state.custom_weights.items():
+            display_name = SCORE_DISPLAY_NAMES.get(weight_key, weight_key.replace("Score", " Score"))
+            new_weight = st.slider(
+                display_name,
+                min_value=0.0,
+                max_value=1.0,
+                value=float(weight_value), # Ensure value is float for slider
+                step=0.01,
+                key=f"weight_{weight_key}"
+            )
+            st.session_state.custom_weights[weight_key] = new_weight
+
+    # Optional: Display sum of weights to help user balance them, though normalization handles it.
+    current_total_weight = sum(st.session_state.custom_weights.values())
+    st.caption(f"Sum of current weights: {current_total_weight:.2f}")
+    if not (0.99 <= current_total_weight <= 1.01) and current_total_weight > 0:
+         st.warning("Weights ideally sum to 1.0 for direct interpretation, but scores are normalized.")
+
 def get_score_badge_html(score_value, score_name, icon):
     color = "#757575"  # Default grey for undefined scores or issues
     if isinstance(score_value, (int, float)):
@@ -959,8 +1109,7 @@ def get_score_badge_html(score_value, score_name, icon):
         score_value = "N/A"
 
     badge_style = f"display: inline-block; padding: 0.3em 0.6em; font-size: 0.9em; font-weight: 600; line-height: 1; text-align: center; white-space: nowrap; vertical-align: baseline; border-radius: 0.25rem; color: white; background-color: {color}; margin-right: 5px;"
-    score_display = f"{score_value:.2f}" if isinstance(score_value, float) else str(score_value)
-    return f'<span style="{badge_style}">{icon} {score_name}: {score_display}</span>'
+    return f'<span style="{badge_style}">{icon} {score_name}: {_fmt_num(score_value, 2)}</span>'
 
 def run_app():
     # Display Canon logo
@@ -988,18 +1137,15 @@ def run_app():
         st.error("Failed to load essential data or initialize the matching system. Please check configurations and data files.")
         return
 
-    all_employees_map = {emp['EmployeeID']: emp for emp in all_employees_list}
+    all_employees_map = load_employee_map(EMPLOYEE_DATA_PATH)
+    employee_chips = load_employee_chips(EMPLOYEE_DATA_PATH)
 
     # --- Project Selection in Main Area ---
     st.subheader("1. Select a Project")
     project_names = [p.get('ProjectName', f"Project ID: {p.get('ProjectID', 'Unknown')}") for p in projects_data]
     selected_project_name = st.selectbox("Choose a project to find matching employees for:", project_names, label_visibility="collapsed")
     
-    selected_project = None
-    for p in projects_data:
-        if p.get('ProjectName', f"Project ID: {p.get('ProjectID', 'Unknown')}") == selected_project_name:
-            selected_project = p
-            break
+    selected_project = load_project_index(PROJECT_DATA_PATH).get(selected_project_name)
 
     if not selected_project:
         st.error("Project data is available, but the selected project could not be found. This is unexpected.")
@@ -1038,16 +1184,7 @@ def run_app():
     # Displaying Skills, Products, Certifications, Expertise using chips-like display (basic markdown for now)
     def display_list_as_chips(title, items_list_or_dict, is_dict_with_levels=False):
         if items_list_or_dict:
-            chip_html = f"**{title}:** "
-            if is_dict_with_levels and isinstance(items_list_or_dict, dict):
-                chip_html += ", ".join([f"<span class='chip skill'>{str(skill)} (Lvl: {str(level)})</span>" for skill, level in items_list_or_dict.items()])
-            elif isinstance(items_list_or_dict, list):
-                chip_html += ", ".join([f"<span class='chip product'>{str(item)}</span>" for item in items_list_or_dict])
-            elif isinstance(items_list_or_dict, dict): # Fallback for dicts not treated as skills with levels
-                 chip_html += ", ".join([f"<span class='chip'>{str(key)}</span>" for key in items_list_or_dict.keys()])
-            else:
-                chip_html += "N/A"
-            st.markdown(chip_html, unsafe_allow_html=True)
+            st.markdown(_chips_html(title, items_list_or_dict, is_dict_with_levels), unsafe_allow_html=True)
         else:
             st.markdown(f"**{title}:** N/A")
 
@@ -1120,66 +1257,24 @@ def run_app():
                 return
 
             # Score candidates
-            detailed_scores_data = generate_detailed_scores_for_candidates(
+            # top_k: the best num_candidates by OverallWeightedScore, already sorted descending (heap selection in the scorer)
+            sorted_candidates = generate_detailed_scores_for_candidates(
                 selected_project, 
                 candidate_employees_for_scoring,
-                custom_weights=st.session_state.custom_weights # Pass the dynamic weights
+                custom_weights=st.session_state.custom_weights, # Pass the dynamic weights
+                top_k=num_candidates
             )
-
-            # Sort candidates by OverallWeightedScore (descending)
-            sorted_candidates = sorted(detailed_scores_data, key=lambda x: x.get('OverallWeightedScore', 0), reverse=True)
             
-            st.session_state['sorted_candidates'] = sorted_candidates
+            st.session_state['sorted_candidates'] = prepare_candidates_for_display(sorted_candidates)
             st.session_state['selected_project_for_results'] = selected_project
 
     # --- Scoring Weights Adjustment Panel ---
-    with st.sidebar.expander("⚙️ Adjust Scoring Weights", expanded=False):
-        for weight_key, weight_value in st.session_state.custom_weights.items():
-            display_name = SCORE_DISPLAY_NAMES.get(weight_key, weight_key.replace("Score", " Score"))
-            new_weight = st.slider(
-                display_name,
-                min_value=0.0,
-                max_value=1.0,
-                value=float(weight_value), # Ensure value is float for slider
-                step=0.01,
-                key=f"weight_{weight_key}"
-            )
-            st.session_state.custom_weights[weight_key] = new_weight
-        
-        # Optional: Display sum of weights to help user balance them, though normalization handles it.
-        current_total_weight = sum(st.session_state.custom_weights.values())
-        st.sidebar.caption(f"Sum of current weights: {current_total_weight:.2f}")
-        if not (0.99 <= current_total_weight <= 1.01) and current_total_weight > 0:
-             st.sidebar.warning("Weights ideally sum to 1.0 for direct interpretation, but scores are normalized.")
+    # Fragments cannot call st.sidebar themselves, so the panel is placed in the sidebar from here
+    with st.sidebar:
+        _weights_panel()
 
     # --- Display Results --- 
     if 'sorted_candidates' in st.session_state and 'selected_project_for_results' in st.session_state:
-        # Apply Availability Filter if any selected
-        candidates_to_display = st.session_state['sorted_candidates']
-        if selected_availability_keys:
-            filtered_candidates = []
-            for cand_score_info in st.session_state['sorted_candidates']:
-                avail_score = cand_score_info.get('Scores', {}).get('AvailabilityScore', -1) # Default to -1 if not found
-                
-                matched_filter = False
-                for key in selected_availability_keys:
-                    filter_type = availability_filter_options[key]
-                    if filter_type == "1.0" and avail_score == 1.0:
-                        matched_filter = True
-                        break
-                    elif filter_type == "0.75" and 0.5 < avail_score < 1.0:
-                        matched_filter = True
-                        break
-                    elif filter_type == "0.25" and 0.0 < avail_score <= 0.5:
-                        matched_filter = True
-                        break
-                    elif filter_type == "0.0" and avail_score == 0.0:
-                        matched_filter = True
-                        break
-                if matched_filter:
-                    filtered_candidates.append(cand_score_info)
-            candidates_to_display = filtered_candidates
-
         st.subheader(f"Top Matching Employees for: {st.session_state['selected_project_for_results'].get('ProjectName', st.session_state['selected_project_for_results'].get('ProjectID'))}")
 
         # --- Sorting Options for Displayed Candidates ---
@@ -1191,21 +1286,17 @@ def run_app():
             key='candidate_sort_option'
         )
 
-        # Apply sorting based on selection
-        if selected_sort_option == "Availability (Highest First)":
-            candidates_to_display = sorted(
-                candidates_to_display, 
-                key=lambda x: x.get('Scores', {}).get('AvailabilityScore', 0), 
-                reverse=True
-            )
-        # Else, it remains sorted by OverallWeightedScore (its original state or if filtered, it preserved relative order)
-        # If it was filtered and we want to re-sort by OverallWeightedScore explicitly:
-        elif selected_sort_option == "Overall Match (Default)" and selected_availability_keys: # only re-sort if filters were applied
-             candidates_to_display = sorted(
-                candidates_to_display, 
-                key=lambda x: x.get('OverallWeightedScore', 0), 
-                reverse=True
-            )
+        # Apply the availability filter and the sort selection (cached per candidate set + selection)
+        scored_candidates = st.session_state['sorted_candidates']
+        display_positions = filter_and_sort_candidates(
+            tuple(
+                (cand_score_info.get('OverallWeightedScore', 0), cand_score_info.get('Scores', {}).get('AvailabilityScore', np.nan))
+                for cand_score_info in scored_candidates
+            ),
+            tuple(sorted({availability_filter_options[key] for key in selected_availability_keys})),
+            selected_sort_option
+        )
+        candidates_to_display = [scored_candidates[i] for i in display_positions]
 
         
         # Enhanced display for matched employees
@@ -1217,81 +1308,67 @@ def run_app():
             
             if candidate_data:
                 employee_name = candidate_data.get('Full Name', f"Employee ID: {employee_id}")
-                overall_score = emp_score_info.get('OverallWeightedScore', 0)
-                # Ensure OverallWeightedScore from scorer is consistently scaled (e.g. 0-100 or 0-1)
-                # For display, if it's 0-1, multiply by 100 for percentage or show as decimal.
                 # Current scorer.py seems to produce scores that can be > 1, so direct .2f is better.
-                # Generate score badges HTML for the title
-                overall_badge_html = get_score_badge_html(overall_score, "Overall", "🎯")
-                avail_score_val = emp_score_info.get('Scores', {}).get('AvailabilityScore', 0.0)
-                avail_badge_html = get_score_badge_html(avail_score_val, "Avail.", "⏱️")
+                # Score badges HTML for the title (built once after scoring, see prepare_candidates_for_display)
+                overall_badge_html, avail_badge_html = emp_score_info['_badges']
                 
                 expander_title_html = f"Rank {rank}: {employee_name} &nbsp; {overall_badge_html} {avail_badge_html}"
 
                 # Render the custom HTML title using st.markdown
                 st.markdown(expander_title_html, unsafe_allow_html=True)
-                
-                # Use a minimal label for the expander itself
-                with st.expander("Details", expanded=(rank==1)):
-                    # Scores are now in the st.markdown title above.
-                    # The <hr> divider might still be useful to separate title from content if we re-add it.
-                    # For now, let's see how it looks without it.
-
-                    # Define data needed across columns first
-                    individual_scores_dict = emp_score_info.get('Scores', {})
-                    project_details = st.session_state['selected_project_for_results']
-
-                    col1, col2 = st.columns([0.55, 0.45]) # Main layout: Left for profile & radar, Right for details
-
-                    with col1: # Left Column: Profile Summary + Radar Chart
-                        # Name is now in expander title, scores are displayed as badges above.
-                        st.caption(f"Employee ID: {employee_id} | Current Role: {candidate_data.get('Role Name', 'N/A')}")
-                        # The st.markdown("---_score_divider---") above handles separation now.
-
-                        # Key Profile Information
-                        st.markdown("**Key Information:**")
-                        availability_date = candidate_data.get('Available From')
-                        availability_date_formatted = format_timestamp_to_date(availability_date) if availability_date else 'N/A'
-                        st.markdown(f"- **Available From:** {availability_date_formatted}")
-                        st.markdown(f"- **Work Location:** {candidate_data.get('Work Location', 'N/A')}")
-                        if 'Role Description' in candidate_data:
-                            with st.popover("View Full Role Description"):
-                                st.markdown(candidate_data['Role Description'])
-                        st.markdown("<br>", unsafe_allow_html=True)
-
-                        # Chips for Skills, Products, Certifications (using existing HTML chip style for now)
-                        employee_skills = candidate_data.get('Core Competencies')
-                        if isinstance(employee_skills, dict) and employee_skills:
-                            skills_html = "**Core Competencies:** " + ", ".join([f"<span class='chip skill'>{str(skill)} (Lvl: {str(level)})</span>" for skill, level in employee_skills.items()])
-                            st.markdown(skills_html, unsafe_allow_html=True)
-                        elif isinstance(employee_skills, list) and employee_skills:
-                            skills_html = "**Core Competencies:** " + ", ".join([f"<span class='chip skill'>{str(skill)}</span>" for skill in employee_skills])
-                            st.markdown(skills_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown("**Core Competencies:** N/A")
-
-                        employee_products = candidate_data.get('Products Experience')
-                        if employee_products and isinstance(employee_products, list):
-                            products_html = "**Products Experience:** " + ", ".join([f"<span class='chip product'>{str(prod)}</span>" for prod in employee_products])
-                            st.markdown(products_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown("**Products Experience:** N/A")
-                        
-                        employee_certs = candidate_data.get('External/Internal Certifications')
-                        if employee_certs and isinstance(employee_certs, list):
-                            certs_html = "**Certifications:** " + ", ".join([f"<span class='chip'>{str(cert)}</span>" for cert in employee_certs])
-                            st.markdown(certs_html, unsafe_allow_html=True)
-                        else:
-                            st.markdown("**Certifications:** N/A")
-                        st.markdown("---")
 
-                        # Radar Chart
-                        st.markdown("##### Score Profile")
-                        radar_fig = create_radar_chart(individual_scores_dict, SCORE_DISPLAY_NAMES, SCORING_WEIGHTS)
-                        if radar_fig:
-                            st.plotly_chart(radar_fig, use_container_width=True, key=f"radar_chart_main_{employee_id}")
-                        else:
-                            st.caption("Not enough score data to display radar chart.")
+                # Streamlit runs an expander's body even while it is collapsed, so the heavy part (radar chart,
+                # attribute comparisons, raw JSON) is only built for candidates whose details are switched on.
+                # Keyed on the employee alone, so a toggle stays put when re-sorting changes the ranks; the top
+                # candidate starts open.
+                details_key = f"show_details_{employee_id}"
+                if rank == 1:
+                    st.session_state.setdefault(details_key, True)
+                if not st.toggle("Show details", key=details_key):
+                    st.markdown("---") # Divider after each employee
+                    continue
+
+                # Scores are now in the st.markdown title above.
+                # The <hr> divider might still be useful to separate title from content if we re-add it.
+                # For now, let's see how it looks without it.
+
+                # Define data needed across columns first
+                individual_scores_dict = emp_score_info.get('Scores', {})
+                project_details = st.session_state['selected_project_for_results']
+
+                col1, col2 = st.columns([0.55, 0.45]) # Main layout: Left for profile & radar, Right for details
+
+                with col1: # Left Column: Profile Summary + Radar Chart
+                    # Name is now in expander title, scores are displayed as badges above.
+                    st.caption(f"Employee ID: {employee_id} | Current Role: {candidate_data.get('Role Name', 'N/A')}")
+                    # The st.markdown("---_score_divider---") above handles separation now.
+
+                    # Key Profile Information (one markdown element; each st.markdown call is a separate frontend element)
+                    availability_date = candidate_data.get('Available From')
+                    availability_date_formatted = format_timestamp_to_date(availability_date) if availability_date else 'N/A'
+                    st.markdown(
+                        "**Key Information:**\n"
+                        f"- **Available From:** {availability_date_formatted}\n"
+                        f"- **Work Location:** {candidate_data.get('Work Location', 'N/A')}"
+                    )
+                    if 'Role Description' in candidate_data:
+                        with st.popover("View Full Role Description"):
+                            st.markdown(candidate_data['Role Description'])
+
+                    # Chips for Skills, Products, Certifications (prebuilt per employee when the employee file is loaded),
+                    # followed by the divider and the radar chart heading, all in one markdown element
+                    chips = employee_chips.get(employee_id) or employee_chips_html(candidate_data)
+                    st.markdown(
+                        "\n\n".join(["<br>", chips['skills_html'], chips['products_html'], chips['certs_html'], "---", "##### Score Profile"]),
+                        unsafe_allow_html=True
+                    )
+
+                    # Radar Chart
+                    radar_fig = create_radar_chart(individual_scores_dict, SCORE_DISPLAY_NAMES, SCORING_WEIGHTS)
+                    if radar_fig:
+                        st.plotly_chart(radar_fig, use_container_width=True, key=f"radar_chart_main_{employee_id}")
+                    else:
+                        st.caption("Not enough score data to display radar chart.")
 
                 with col2: # Right Column: Tabs for Detailed Breakdowns
                     st.subheader("Detailed Assessment")
@@ -1303,64 +1380,27 @@ def run_app():
                         if not project_details or not candidate_data:
                             st.warning("Project or candidate data is missing. Cannot display attribute comparisons.")
                         else:
-                            for config_entry in ATTRIBUTE_COMPARISON_CONFIG:
-                                label = config_entry["label"]
-                                render_function_name = config_entry.get("render_function_name")
-                                render_function = globals().get(render_function_name)
-                                if render_function:
-                                    project_value = None
-                                    employee_value = None
-                                    project_data_key = config_entry.get("project_key")
-                                    if project_data_key:
-                                        project_value = project_details.get(project_data_key)
-                                    employee_data_key = config_entry.get("employee_key")
-                                    if employee_data_key:
-                                        employee_value = candidate_data.get(employee_data_key)
-                                    try:
-                                        score_key = config_entry.get("score_key")
-                                        if score_key == "AvailabilityScore" and "Details" in emp_score_info and "AvailabilityScore" in emp_score_info["Details"]:
-                                            employee_value = emp_score_info["Details"]["AvailabilityScore"]
-                                        render_function(
-                                            project_value=project_value, 
-                                            employee_value=employee_value,
-                                            project_details=project_details, 
-                                            candidate_data=candidate_data,
-                                            config_entry=config_entry
-                                        )
-                                    except Exception as e:
-                                        st.error(f"Error rendering '{label}': {e}")
-                                else:
-                                    st.warning(f"Render function '{render_function_name}' for '{label}' not found.")
+                            render_all_comparisons(project_details, candidate_data, emp_score_info)
                     
                     with scores_tab:
                         st.markdown("##### Detailed Score Breakdown")
                         st.caption("Review the individual components contributing to the overall match score. Each score is weighted to reflect its importance.")
                         st.markdown("---")
                         score_detail_cols = st.columns(2)
-                        score_keys_ordered = list(SCORE_DISPLAY_NAMES.keys()) # Ensure consistent order if needed
-
-                        for i, score_key in enumerate(score_keys_ordered):
-                            display_name = SCORE_DISPLAY_NAMES[score_key]
-                            raw_score_value = individual_scores_dict.get(score_key, 0.0)
-                            # Special handling for RetrieverScore if its primary key isn't found
-                            if score_key == "RetrieverScore" and score_key not in individual_scores_dict:
-                                raw_score_value = individual_scores_dict.get('document_score', 0.0) # Assuming 'document_score' is the alternative
-                            
-                            explanation = SCORE_EXPLANATIONS.get(score_key, "No explanation available.")
-                            weight = SCORING_WEIGHTS.get(score_key, 0.0) # Ensure weight is float for consistent formatting
-                            
+
+                        formatted_scores = emp_score_info['_fmt'] # Formatted once after scoring
+                        for i, (score_key, display_name, explanation, weight_label) in enumerate(_SCORE_META):
                             current_col = score_detail_cols[i % 2]
                             
                             current_col.markdown(f"**{display_name}**")
-                            current_col.metric(label="Match Score", value=f"{float(raw_score_value):.2f}", delta=f"Weight: {weight:.2f}", delta_color="off")
+                            current_col.metric(label="Match Score", value=formatted_scores[score_key], delta=weight_label, delta_color="off")
                             current_col.caption(explanation)
-                            if i < len(score_keys_ordered) - 2: # Add separator if not one of the last two items (one for each col)
+                            if i < len(_SCORE_META) - 2: # Add separator if not one of the last two items (one for each col)
                                current_col.markdown("---")
 
                     with raw_data_tab:
                         st.caption("Raw score and details JSON for this candidate.")
-                        display_scores = emp_score_info.get('Details', emp_score_info)
-                        st.json(display_scores)
+                        st.json(emp_score_info['Details']) # Always present (see prepare_candidates_for_display)
 
             else:
                 st.warning(f"Could not retrieve full data for Employee ID: {employee_id}. Scores: {emp_score_info.get('OverallWeightedScore', 0):.2f}")